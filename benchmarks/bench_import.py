@@ -0,0 +1,152 @@
+"""Benchmark: cold import time of the bot, with a regression check.
+
+Usage: python benchmarks/bench_import.py [--runs N] [--check] [--update] [--top N]
+
+Imports each target in a fresh interpreter with none of the bot's
+environment variables set, and reports the fastest and median wall time of
+the import itself (interpreter start-up is not counted). The check uses the
+fastest run, since noise from the rest of the machine only ever adds time.
+Every run also checks that importing has no side effects: it must not fail without configuration,
+must not start threads, and the light targets must not pull in discord.py,
+aiohttp or dotenv.
+
+--check compares the fastest runs with benchmarks/import_baseline.json and
+exits 1 if a target got slower than baseline * (1 + tolerance) + slack, or
+if a side-effect check fails. --update rewrites the baseline from this
+run. Baselines only compare on the same machine, so record them where the
+check runs (e.g. the host the bot is deployed to).
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+BASELINE = os.path.join(ROOT, "benchmarks", "import_baseline.json")
+HEAVY_MODULES = ("discord", "aiohttp", "dotenv")
+
+# name -> (modules imported, light: must not load HEAVY_MODULES)
+TARGETS = {
+    "main": (["main"], True),
+    "lanschild": (["lanschild"], True),
+    "lanschild.config": (["lanschild.config"], True),
+    "lanschild.bot": (["lanschild.bot"], False),
+    "lanschild.bot + cogs": (None, False),   # filled in from EXTENSIONS below
+}
+
+PROBE = """
+import json, sys, threading, time
+start = time.perf_counter()
+for name in sys.argv[1:]:
+    __import__(name)
+elapsed = time.perf_counter() - start
+print(json.dumps({
+    "seconds": elapsed,
+    "threads": threading.active_count(),
+    "heavy": sorted(m for m in %r if m in sys.modules),
+}))
+""" % (HEAVY_MODULES,)
+
+
+def bare_env():
+    # Just enough to find the interpreter; none of the bot's settings
+    return {name: os.environ[name] for name in ("PATH", "HOME", "SYSTEMROOT") if name in os.environ}
+
+
+def probe(modules, importtime=False):
+    command = [sys.executable] + (["-X", "importtime"] if importtime else []) + ["-c", PROBE, *modules]
+    result = subprocess.run(command, cwd=ROOT, env=bare_env(), capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"importing {' '.join(modules)} failed:\n{result.stderr}")
+    return json.loads(result.stdout.strip().splitlines()[-1]), result.stderr
+
+
+def slowest_imports(importtime_log, modules, top):
+    """What the target modules import directly, by cumulative time, from -X importtime output."""
+    children, totals = [], []
+    for line in importtime_log.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line[12:].split("|")
+        if not cumulative.strip().isdigit():
+            continue  # the header
+        name = name[1:]
+        depth = (len(name) - len(name.lstrip())) // 2
+        # A module's imports are listed before it, one level deeper
+        if depth == 1:
+            children.append((int(cumulative), name.strip()))
+        elif depth == 0:
+            if name in modules:
+                totals.extend(children)
+            children = []
+    return sorted(totals, reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=7)
+    parser.add_argument("--check", action="store_true", help="fail if slower than the baseline")
+    parser.add_argument("--update", action="store_true", help="write this run as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.5, help="allowed slowdown as a fraction of the baseline")
+    parser.add_argument("--slack", type=float, default=5.0, help="allowed slowdown in ms on top of the tolerance")
+    parser.add_argument("--top", type=int, default=0, help="show the N slowest top-level imports per target")
+    args = parser.parse_args()
+
+    from lanschild.bot import EXTENSIONS
+    TARGETS["lanschild.bot + cogs"] = (["lanschild.bot", *EXTENSIONS], False)
+
+    failures = []
+    fastest = {}
+    for name, (modules, light) in TARGETS.items():
+        samples = []
+        for _ in range(args.runs):
+            result, _ = probe(modules)
+            samples.append(result["seconds"])
+            if result["threads"] != 1:
+                failures.append(f"{name}: import started {result['threads'] - 1} thread(s)")
+            if light and result["heavy"]:
+                failures.append(f"{name}: import loaded {', '.join(result['heavy'])}")
+        fastest[name] = min(samples)
+        print(f"{name:<22} min {fastest[name] * 1000:8.1f} ms  median {statistics.median(samples) * 1000:8.1f} ms  ({args.runs} runs)")
+        if args.top:
+            _, log = probe(modules, importtime=True)
+            for cumulative, module in slowest_imports(log, modules, args.top):
+                print(f"    {module:<24} {cumulative / 1000:8.1f} ms")
+
+    if args.check:
+        with open(BASELINE, encoding="utf-8") as f:
+            baseline = json.load(f)
+        for name, seconds in fastest.items():
+            if name not in baseline["targets"]:
+                continue
+            budget = baseline["targets"][name] * (1 + args.tolerance) + args.slack / 1000
+            if seconds > budget:
+                failures.append(
+                    f"{name}: {seconds * 1000:.1f} ms is over the {budget * 1000:.1f} ms budget "
+                    f"(baseline {baseline['targets'][name] * 1000:.1f} ms)"
+                )
+
+    if args.update:
+        with open(BASELINE, "w", encoding="utf-8") as f:
+            json.dump({
+                "python": sys.version.split()[0],
+                "runs": args.runs,
+                "targets": {name: round(seconds, 4) for name, seconds in fastest.items()},
+            }, f, indent=2)
+            f.write("\n")
+        print(f"Baseline written to {os.path.relpath(BASELINE, ROOT)}")
+
+    for failure in dict.fromkeys(failures):
+        print(f"❌ {failure}")
+    if failures:
+        sys.exit(1)
+    if args.check:
+        print("✅ Import times within budget.")
+
+
+if __name__ == "__main__":
+    main()
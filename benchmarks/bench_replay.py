@@ -0,0 +1,381 @@
+"""Benchmark: replay a message stream through on_message and the command dispatcher.
+
+Usage: python benchmarks/bench_replay.py [--stream FILE] [--messages N]
+                                         [--concurrency N] [--latency MS]
+
+Builds the bot and loads its cogs without connecting to Discord and feeds it fake messages from
+one fake guild. GitHub (tools/fake_github.py), Tenor and dictionaryapi are
+served by a local stub with --latency of simulated network time per
+request, so the run is offline and repeatable.
+
+The stream is JSON lines of {"author": user id, "content": text}. Without
+--stream one is built from benchmarks/messages.txt with a command mixed in
+every few messages (seeded, so every run replays the same stream).
+Messages are dispatched like the gateway does, as concurrent tasks, with
+at most --concurrency in flight.
+
+Reports messages/sec, p50/p99 latency of on_message overall and per
+command, and the outbound calls made: HTTP requests per service as seen by
+the stub, and Discord API calls (sends, replies, role edits, deletes) as
+seen by the fakes.
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import itertools
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+import discord
+from aiohttp import web
+from discord.ext import commands
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "tools"))
+
+from fake_github import FakeContentsAPI  # noqa: E402
+from lanschild.bot import EXTENSIONS, LansChild  # noqa: E402
+from lanschild.config import Config  # noqa: E402
+
+PORT = 8791
+BASE = f"http://127.0.0.1:{PORT}"
+GUILD_ID = 100
+PROMPT_CHANNEL_ID = 200
+COUNTER_CHANNEL_ID = 201
+BOT_USER_ID = 1
+BONK_USER_ID = 394034047258460162
+BONK_EMOJI = "<:WeissBonk:863168696498257941>"
+STATE_FILE_NAMES = ("cosmetic_roles.json", "bonk_counter.json", "current_prompt.txt")
+
+WORDS = ["cat", "rose", "knight", "cookie", "ember", "glyph", "semblance", "xyzzy"]
+GIF_SEARCHES = ["ruby rose", "weiss", "bonk", "cookies", "happy dance"]
+COMMANDS = [
+    "!hello", "!gold", "!ask will the epilogue ever be finished?", "!bonk",
+    "!gif {search}", "!define {word}", "!getrole {role}", "!remove", "!listroles",
+    "!prompt", "!help", "!msgdebug", "!nosuchcommand",
+]
+ID_COUNTER = itertools.count(10_000)
+
+
+# --- Fake Discord objects ---
+class Calls:
+    """Discord API calls made by the bot, by kind."""
+
+    def __init__(self):
+        self.counts = {}
+
+    def add(self, kind):
+        self.counts[kind] = self.counts.get(kind, 0) + 1
+
+
+class FakeRole:
+    def __init__(self, role_id, name, position, guild):
+        self.id = role_id
+        self.name = name
+        self.position = position
+        self.guild = guild
+        self.mention = f"<@&{role_id}>"
+
+    def is_default(self):
+        return self.id == self.guild.id
+
+
+class FakeMember:
+    def __init__(self, user_id, guild, calls, admin=False):
+        self.id = user_id
+        self.name = self.display_name = f"user{user_id}"
+        self.mention = f"<@{user_id}>"
+        self.bot = False
+        self.guild = guild
+        self.roles = [guild.default_role]
+        self.admin = admin
+        self._calls = calls
+
+    async def edit(self, *, roles=None, reason=None):
+        self._calls.add("member.edit")
+        if roles is not None:
+            self.roles = [self.guild.default_role] + [role for role in roles if not role.is_default()]
+
+
+class FakeGuild:
+    def __init__(self, role_names):
+        self.id = GUILD_ID
+        self.name = "Replay Guild"
+        self.default_role = FakeRole(GUILD_ID, "@everyone", 0, self)
+        self.roles = [self.default_role] + [
+            FakeRole(GUILD_ID + 1 + i, name, i + 1, self) for i, name in enumerate(role_names)
+        ]
+        self._roles = {role.id: role for role in self.roles}
+        self.members = {}
+
+    def get_role(self, role_id):
+        return self._roles.get(role_id)
+
+    def get_member(self, user_id):
+        return self.members.get(user_id)
+
+    def get_member_named(self, name):
+        return next((member for member in self.members.values() if member.name == name), None)
+
+
+class FakeMessage:
+    def __init__(self, content, author, channel, calls):
+        self.id = next(ID_COUNTER)
+        self.content = content
+        self.author = author
+        self.channel = channel
+        self.guild = channel.guild
+        self.attachments = []
+        self._state = None
+        self._calls = calls
+
+    async def reply(self, content=None, **kwargs):
+        self._calls.add("message.reply")
+        return FakeMessage(content or "", self.channel.guild.me, self.channel, self._calls)
+
+    async def edit(self, **kwargs):
+        self._calls.add("message.edit")
+
+    async def delete(self):
+        self._calls.add("message.delete")
+
+
+class FakeChannel:
+    type = discord.ChannelType.text
+
+    def __init__(self, channel_id, guild, calls):
+        self.id = channel_id
+        self.guild = guild
+        self.mention = f"<#{channel_id}>"
+        self._calls = calls
+
+    def permissions_for(self, member):
+        return discord.Permissions.all() if getattr(member, "admin", False) else discord.Permissions.general()
+
+    async def send(self, content=None, **kwargs):
+        self._calls.add("channel.send")
+        return FakeMessage(content or "", self.guild.me, self, self._calls)
+
+
+class ReplayContext(commands.Context):
+    """Context whose replies go to the fake channel instead of Discord's HTTP API."""
+
+    async def send(self, content=None, **kwargs):
+        return await self.channel.send(content, **kwargs)
+
+    async def reply(self, content=None, **kwargs):
+        return await self.message.reply(content, **kwargs)
+
+
+# --- Stub for GitHub, Tenor and dictionaryapi ---
+class Stub:
+    def __init__(self, root, latency):
+        self.latency = latency
+        self.github = FakeContentsAPI(root)
+        self.counts = {"github": 0, "tenor": 0, "dictionary": 0}
+
+    @web.middleware
+    async def count(self, request, handler):
+        service = request.path.split("/")[1]
+        service = "github" if service == "repos" else service
+        self.counts[service] = self.counts.get(service, 0) + 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return await handler(request)
+
+    async def tenor(self, request):
+        search = request.query.get("q", "")
+        pos = int(request.query.get("pos") or 0)
+        limit = int(request.query.get("limit") or 20)
+        results = [
+            {"media_formats": {"gif": {"url": f"https://media.tenor.test/{search.replace(' ', '-')}/{pos + i}.gif"}}}
+            for i in range(limit)
+        ]
+        return web.json_response({"results": results, "next": str(pos + limit) if pos < 100 else ""})
+
+    async def dictionary(self, request):
+        word = request.match_info["word"]
+        if word not in WORDS[:-1]:
+            return web.json_response({"title": "No Definitions Found"}, status=404)
+        entry = {
+            "word": word,
+            "phonetics": [{"text": f"/{word}/"}],
+            "meanings": [{
+                "partOfSpeech": "noun",
+                "definitions": [{"definition": f"A {word}, definition {i}.", "example": f"Look, a {word}."} for i in range(5)],
+            }],
+        }
+        return web.json_response([entry])
+
+    def app(self):
+        app = self.github.app()
+        app.middlewares.insert(0, self.count)
+        app.router.add_get("/tenor/v2/search", self.tenor)
+        app.router.add_get("/dictionary/api/v2/entries/en/{word}", self.dictionary)
+        return app
+
+
+# --- Stream ---
+def build_stream(count, command_every, role_keys, seed=0):
+    rng = random.Random(seed)
+    with open(os.path.join(ROOT, "benchmarks", "messages.txt"), encoding="utf-8") as f:
+        lines = [line.rstrip("\n") for line in f if line.strip()]
+    authors = [20_000 + i for i in range(40)]
+    stream = []
+    for i in range(count):
+        if i % command_every == command_every - 1:
+            content = rng.choice(COMMANDS).format(
+                search=rng.choice(GIF_SEARCHES), word=rng.choice(WORDS), role=rng.choice(role_keys),
+            )
+        else:
+            content = lines[i % len(lines)]
+        author = rng.choice(authors)
+        if rng.random() < 0.02 and not content.startswith("!"):
+            author, content = BONK_USER_ID, f"{content} {BONK_EMOJI}"
+        stream.append({"author": author, "content": content})
+    return stream
+
+
+def load_stream(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def percentile(samples, p):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))]
+
+
+def kind_of(content):
+    return content.split()[0] if content.startswith("!") else "chat"
+
+
+# --- Replay ---
+def prepare_environment(latency):
+    """Seed the local state dir and the fake GitHub, point the bot at the stub."""
+    state_dir = tempfile.mkdtemp(prefix="replay-state-")
+    github_root = tempfile.mkdtemp(prefix="replay-github-")
+    for name in STATE_FILE_NAMES:
+        shutil.copy(os.path.join(ROOT, name), state_dir)
+        shutil.copy(os.path.join(ROOT, name), github_root)
+    contents = f"{BASE}/repos/me/bot/contents"
+    os.environ.update({
+        "DISCORD_TOKEN": "replay",
+        "TENOR_API_KEY": "replay",
+        "PROMPT_CHANNEL_ID": str(PROMPT_CHANNEL_ID),
+        "COUNTER_CHANNEL_ID": str(COUNTER_CHANNEL_ID),
+        "STATE_DIR": state_dir,
+        "COSMETIC_ROLES_URL": f"{contents}/cosmetic_roles.json",
+        "COSMETIC_ROLES_UPLOAD_URL": f"{contents}/cosmetic_roles.json",
+        "BONK_COUNTER_URL": f"{contents}/bonk_counter.json",
+        "BONK_COUNTER_UPLOAD_URL": f"{contents}/bonk_counter.json",
+        "CURRENT_PROMPT_URL": f"{contents}/current_prompt.txt",
+        "CURRENT_PROMPT_UPLOAD_URL": f"{contents}/current_prompt.txt",
+        "TENOR_SEARCH_URL": f"{BASE}/tenor/v2/search",
+        "DICTIONARY_API_URL": f"{BASE}/dictionary/api/v2/entries/en",
+    })
+    for name in ("PROMPT_BAG_URL", "PROMPT_CONFIG_URL", "PROMPT_POSTS_URL", "KEEP_ALIVE_URL", "DEFINE_CACHE_PATH"):
+        os.environ.pop(name, None)
+    return Stub(github_root, latency / 1000)
+
+
+async def replay(args):
+    stub = prepare_environment(args.latency)
+    os.chdir(ROOT)  # triggers.json is read relative to the working directory
+    bot = LansChild(Config.from_env())
+    calls = Calls()
+    with open(os.path.join(ROOT, "cosmetic_roles.json"), encoding="utf-8") as f:
+        cosmetic = json.load(f)
+    guild = FakeGuild(list(cosmetic.values()) + [f"Filler {i}" for i in range(200)])
+    guild.me = FakeMember(BOT_USER_ID, guild, calls)
+    channels = {cid: FakeChannel(cid, guild, calls) for cid in (300, PROMPT_CHANNEL_ID, COUNTER_CHANNEL_ID)}
+    chat = channels[300]
+
+    stream = load_stream(args.stream) if args.stream else build_stream(args.messages, args.command_every, list(cosmetic))
+    for entry in stream:
+        if entry["author"] not in guild.members:
+            guild.members[entry["author"]] = FakeMember(entry["author"], guild, calls, admin=entry.get("admin", False))
+
+    # Stand in for the gateway connection: no login, no websocket
+    await bot._async_setup_hook()
+    await bot.load_extensions()
+    bot._connection.user = guild.me
+    bot.get_channel = channels.get
+
+    async def get_context(origin, *, cls=ReplayContext):
+        return await commands.Bot.get_context(bot, origin, cls=cls)
+
+    bot.get_context = get_context
+    errors = {}
+
+    async def record_error(ctx, error):
+        name = type(getattr(error, "original", error)).__name__
+        errors[name] = errors.get(name, 0) + 1
+
+    bot.add_listener(record_error, "on_command_error")
+
+    runner = web.AppRunner(stub.app(), access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", PORT).start()
+    await bot.http_pool.start()
+
+    latencies = {}
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def deliver(entry):
+        message = FakeMessage(entry["content"], guild.members[entry["author"]], chat, calls)
+        async with semaphore:
+            start = time.perf_counter()
+            # What bot.dispatch("message") runs: the bot's on_message (commands) and every cog listener
+            handlers = [bot.on_message, *bot.extra_events.get("on_message", ())]
+            for result in await asyncio.gather(*(handler(message) for handler in handlers), return_exceptions=True):
+                if isinstance(result, Exception):
+                    errors[type(result).__name__] = errors.get(type(result).__name__, 0) + 1
+            latencies.setdefault(kind_of(entry["content"]), []).append(time.perf_counter() - start)
+
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):   # the bot's own debug prints
+            start = time.perf_counter()
+            await asyncio.gather(*(deliver(entry) for entry in stream))
+            elapsed = time.perf_counter() - start
+            await asyncio.sleep(0.1)   # let error listeners finish
+            await bot.state_store.close()
+    finally:
+        for extension in EXTENSIONS:
+            await bot.unload_extension(extension)
+        await bot.http_pool.close()
+        await runner.cleanup()
+
+    every = [seconds for samples in latencies.values() for seconds in samples]
+    print(f"{len(stream)} messages in {elapsed:.2f}s: {len(stream) / elapsed:.0f} msgs/sec "
+          f"(concurrency {args.concurrency}, stub latency {args.latency:g} ms)")
+    print(f"on_message    p50 {percentile(every, 50) * 1000:8.2f} ms  p99 {percentile(every, 99) * 1000:8.2f} ms")
+    for kind, samples in sorted(latencies.items(), key=lambda item: -len(item[1])):
+        print(f"  {kind:<14} {len(samples):5d}  p50 {percentile(samples, 50) * 1000:8.2f} ms  "
+              f"p99 {percentile(samples, 99) * 1000:8.2f} ms")
+    print(f"HTTP calls (stub): {stub.counts}")
+    print(f"Discord calls: {dict(sorted(calls.counts.items()))}")
+    print(f"Scheduler: {bot.request_scheduler.stats}")
+    if errors:
+        print(f"Errors: {errors}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--stream", help="JSON lines file of {author, content} records to replay")
+    parser.add_argument("--messages", type=int, default=3000, help="length of the generated stream")
+    parser.add_argument("--command-every", type=int, default=5, help="one command per N generated messages")
+    parser.add_argument("--concurrency", type=int, default=32, help="messages in flight at once")
+    parser.add_argument("--latency", type=float, default=20, help="simulated network latency per stub request, in ms")
+    asyncio.run(replay(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
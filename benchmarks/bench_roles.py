@@ -0,0 +1,128 @@
+"""Benchmark: CosmeticRoleIndex vs discord.utils.get scans for the role commands.
+
+Usage: python benchmarks/bench_roles.py [guild_roles] [cosmetic_roles] [rounds]
+
+Builds a fake guild with many roles and times the work !getrole does
+before its edit: find the requested role and compute the member's new role
+set. The indexed side runs the same toggle_role transform the command hands
+to RoleEditQueue.
+"""
+import json
+import os
+import random
+import sys
+import time
+
+import discord
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from lanschild.cogs.roles import toggle_role  # noqa: E402
+from role_index import CosmeticRoleIndex  # noqa: E402
+
+
+class FakeRole:
+    __slots__ = ("id", "name", "position", "guild")
+
+    def __init__(self, role_id, name, position, guild):
+        self.id = role_id
+        self.name = name
+        self.position = position
+        self.guild = guild
+
+
+class FakeGuild:
+    def __init__(self, names):
+        self.id = 1
+        self.roles = [FakeRole(1000 + i, name, i, self) for i, name in enumerate(names)]
+        self._by_id = {role.id: role for role in self.roles}
+
+    def get_role(self, role_id):
+        return self._by_id.get(role_id)
+
+
+class FakeMember:
+    def __init__(self, guild, roles):
+        self.guild = guild
+        self.roles = roles
+
+    def get_role(self, role_id):
+        return next((r for r in self.roles if r.id == role_id), None)
+
+
+def legacy_getrole(guild, member, config, role_key):
+    # The old !getrole: one linear scan per configured cosmetic role.
+    role = discord.utils.get(guild.roles, name=config[role_key])
+    held = role in member.roles
+    to_remove = []
+    for other_key, other_name in config.items():
+        if other_key == role_key:
+            continue
+        other = discord.utils.get(guild.roles, name=other_name)
+        if other and other in member.roles:
+            to_remove.append(other)
+    return role, held, to_remove
+
+
+def legacy_new_ids(member, role, held, to_remove):
+    ids = {r.id for r in member.roles}
+    if held:
+        return ids - {role.id}
+    return (ids - {r.id for r in to_remove}) | {role.id}
+
+
+def indexed_getrole(index, guild, member, config, role_key):
+    # As in Roles.getrole, then the transform as RoleEditQueue runs it
+    role = index.get_role(guild, config[role_key])
+    cosmetic_ids = set(index.cosmetic_ids(guild, config))
+    ids, outcome = toggle_role(role.id, cosmetic_ids)({r.id for r in member.roles})
+    return role, ids, outcome
+
+
+def main():
+    guild_roles = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    rounds = int(sys.argv[3]) if len(sys.argv) > 3 else 200
+    with open(os.path.join(ROOT, "cosmetic_roles.json"), encoding="utf-8") as f:
+        config = json.load(f)
+    if len(sys.argv) > 2:
+        wanted = int(sys.argv[2])
+        config = {f"key{i}": f"Cosmetic {i}" for i in range(wanted)}
+
+    rng = random.Random(42)
+    names = [f"Role {i}" for i in range(guild_roles - len(config))] + list(config.values())
+    rng.shuffle(names)
+    guild = FakeGuild(names)
+    cosmetic = [r for r in guild.roles if r.name in set(config.values())]
+    plain = [r for r in guild.roles if r.name not in set(config.values())]
+    members = [FakeMember(guild, rng.sample(plain, 20) + rng.sample(cosmetic, 2)) for _ in range(50)]
+    keys = list(config)
+
+    index = CosmeticRoleIndex()
+    requests = [(rng.choice(members), rng.choice(keys)) for _ in range(rounds)]
+
+    for member, key in requests[:20]:
+        old_role, old_held, old_removed = legacy_getrole(guild, member, config, key)
+        new_role, new_ids, outcome = indexed_getrole(index, guild, member, config, key)
+        assert old_role is new_role and old_held == (outcome == "removed")
+        assert legacy_new_ids(member, old_role, old_held, old_removed) == new_ids
+
+    print(f"{len(guild.roles)} guild roles, {len(config)} cosmetic roles, {rounds} !getrole calls")
+    start = time.perf_counter()
+    for member, key in requests:
+        legacy_getrole(guild, member, config, key)
+    legacy = time.perf_counter() - start
+
+    index = CosmeticRoleIndex()
+    start = time.perf_counter()
+    for member, key in requests:
+        indexed_getrole(index, guild, member, config, key)
+    indexed = time.perf_counter() - start
+
+    print(f"legacy   {legacy / rounds * 1e6:10.1f} µs/call")
+    print(f"indexed  {indexed / rounds * 1e6:10.1f} µs/call (including the one-off index build)")
+    print(f"speedup  {legacy / indexed:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
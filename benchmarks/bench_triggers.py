@@ -0,0 +1,93 @@
+"""Microbenchmark: compiled TriggerEngine vs the old per-group on_message loop.
+
+Usage: python benchmarks/bench_triggers.py [corpus.txt] [rounds]
+
+The corpus is one message per line. benchmarks/messages.txt is a sample;
+point this at an exported channel log to benchmark real traffic.
+"""
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from triggers import TriggerEngine, load_triggers  # noqa: E402
+
+TRIGGERS_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "triggers.json")
+GROUPS = [(t["name"], t["match"], t["patterns"]) for t in load_triggers(TRIGGERS_PATH)]
+
+# Regexes that change meaning or fail to compile when pasted into one
+# alternation, next to plain ones, checked against the one-by-one search.
+EDGE_GROUPS = [
+    ("plain", "regex", [r"\bfoo\b"]),
+    ("group", "regex", [r"(a|b)c"]),
+    ("backref", "regex", [r"(b)\1"]),
+    ("backref2", "regex", [r"(x)(y)\2\1"]),
+    ("named", "regex", [r"(?P<w>zz)q"]),
+    ("named_again", "regex", [r"(?P<w>qq)z"]),
+    ("inline_flag", "regex", [r"(?i)hello"]),
+    ("flag_group", "regex", [r"(?s:a.b)"]),
+    ("lookaround", "regex", [r"(?<=x)yz(?!w)"]),
+    ("class_paren", "regex", [r"[(]\d+[)]", r"[]a(]{3}"]),
+    ("mixed", "regex", [r"mix", r"(m)\1ix"]),
+    ("phrase", "phrase", ["bb"]),
+]
+EDGE_MESSAGES = [
+    "bb", "ac bc", "xyyx", "zzq qqz", "HELLO there", "a\nb", "xyz", "xyzw",
+    "(12)", "](a", "mmix", "foo", "food", "nothing here", "",
+]
+
+
+def legacy_match(content, groups=GROUPS):
+    # Mirrors the old hard-coded on_message: lower() per check, one any() scan per group.
+    fired = []
+    for name, match_type, patterns in groups:
+        if match_type == "regex":
+            if any(re.search(pattern, content.lower()) for pattern in patterns):
+                fired.append(name)
+        elif any(phrase in content.lower() for phrase in patterns):
+            fired.append(name)
+    return fired
+
+
+def run(label, fn, corpus, rounds):
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for message in corpus:
+            fn(message)
+        best = min(best, time.perf_counter() - start)
+    per_msg = best / len(corpus) * 1e6
+    print(f"{label:<10} {best * 1000:8.2f} ms/pass  {per_msg:6.2f} µs/msg")
+    return best
+
+
+def main():
+    path = sys.argv[1] if len(sys.argv) > 1 else os.path.join(os.path.dirname(__file__), "messages.txt")
+    rounds = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    with open(path, encoding="utf-8") as f:
+        corpus = [line.rstrip("\n") for line in f if line.strip()]
+
+    edge_engine = TriggerEngine(EDGE_GROUPS)
+    edge_mismatches = [m for m in EDGE_MESSAGES if edge_engine.match(m) != legacy_match(m, EDGE_GROUPS)]
+    if edge_mismatches:
+        print(f"❌ Edge-case patterns matched differently, e.g. {edge_mismatches[0]!r}")
+        sys.exit(1)
+
+    engine = TriggerEngine(GROUPS)
+
+    mismatches = [m for m in corpus if engine.match(m) != legacy_match(m)]
+    if mismatches:
+        print(f"❌ {len(mismatches)} messages matched differently, e.g. {mismatches[0]!r}")
+        sys.exit(1)
+
+    fired = sum(1 for m in corpus if engine.match(m))
+    print(f"{len(corpus)} messages, {fired} with at least one trigger, best of {rounds}")
+    legacy = run("legacy", legacy_match, corpus, rounds)
+    compiled = run("compiled", engine.match, corpus, rounds)
+    print(f"speedup    {legacy / compiled:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+import asyncio
+import contextvars
+import json
+import logging
+import os
+import random
+import tempfile
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+# --- Caching Helpers ---
+
+
+class SingleFlight:
+    """Collapses concurrent calls for the same key into one in-flight call.
+
+    The first caller for a key runs ``fetch()``; everyone who asks for the
+    same key before it finishes awaits that same result (or exception).
+    """
+
+    def __init__(self):
+        self._inflight = {}
+
+    def __contains__(self, key):
+        return key in self._inflight
+
+    async def do(self, key, fetch):
+        future = self._inflight.get(key)
+        if future is not None:
+            return await asyncio.shield(future)
+        future = asyncio.ensure_future(fetch())
+        self._inflight[key] = future
+
+        def forget(done):
+            if self._inflight.get(key) is done:
+                del self._inflight[key]
+
+        future.add_done_callback(forget)
+        # Shielded so one impatient caller cannot cancel the fetch for the rest
+        return await asyncio.shield(future)
+
+
+class TTLCache:
+    """Bounded LRU cache whose entries expire after a TTL.
+
+    ``None`` is a valid cached value (a negative result) and gets its own,
+    usually shorter, ``negative_ttl``. Expiry uses wall-clock time so the
+    cache can be saved to disk and reloaded across restarts.
+    """
+
+    def __init__(self, maxsize=512, ttl=86400, negative_ttl=3600):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._data = OrderedDict()   # key -> (expires_at, value)
+        self._flights = SingleFlight()
+        self.stats = {"hits": 0, "negative_hits": 0, "misses": 0, "coalesced": 0}
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key, default=None):
+        item = self._data.get(key)
+        if item is None:
+            return default
+        expires_at, value = item
+        if expires_at <= time.time():
+            del self._data[key]
+            return default
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key, value):
+        ttl = self.negative_ttl if value is None else self.ttl
+        self._data[key] = (time.time() + ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    async def get_or_fetch(self, key, fetch):
+        """Return the cached value for key, calling ``fetch()`` at most once on a miss.
+
+        Exceptions from fetch are passed on and never cached.
+        """
+        item = self._data.get(key)
+        if item is not None and item[0] > time.time():
+            self._data.move_to_end(key)
+            self.stats["negative_hits" if item[1] is None else "hits"] += 1
+            return item[1]
+        if key in self._flights:
+            self.stats["coalesced"] += 1
+        else:
+            self.stats["misses"] += 1
+
+        async def fetch_and_store():
+            value = await fetch()
+            self.set(key, value)
+            return value
+
+        return await self._flights.do(key, fetch_and_store)
+
+    def hit_rate(self):
+        served = self.stats["hits"] + self.stats["negative_hits"] + self.stats["coalesced"]
+        total = served + self.stats["misses"]
+        return served / total if total else 0.0
+
+    # --- persistence ---
+    def save(self, path):
+        now = time.time()
+        items = [[key, expires_at, value] for key, (expires_at, value) in self._data.items() if expires_at > now]
+        directory = os.path.dirname(path) or "."
+        fd, tmp = tempfile.mkstemp(dir=directory, prefix=".cache.", suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(items, f)
+        os.replace(tmp, path)
+
+    def load(self, path):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                items = json.load(f)
+        except FileNotFoundError:
+            return 0
+        except ValueError as e:
+            logger.error(f"❌ Ignoring unreadable cache file {path}: {e}")
+            return 0
+        now = time.time()
+        for key, expires_at, value in items:
+            if expires_at > now:
+                self._data[key] = (expires_at, value)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+        return len(self._data)
+
+
+class ResultPool:
+    """Per-query pools of search results, drawn at random without repeats.
+
+    ``fetch(query, pos)`` returns ``(items, next_pos)``. A query's first pick
+    waits for one fetch (shared by concurrent callers); after that, picks
+    come straight from memory. When a pool drops to ``low_water`` items the
+    next page is fetched in the background. Pools expire after ``ttl``
+    seconds and at most ``maxsize`` queries are kept (least recently used
+    are dropped first).
+    """
+
+    def __init__(self, fetch, ttl=3600, low_water=5, maxsize=256):
+        self.fetch = fetch
+        self.ttl = ttl
+        self.low_water = low_water
+        self.maxsize = maxsize
+        self._pools = OrderedDict()   # query -> {"items", "next_pos", "expires_at"}
+        self._flights = SingleFlight()
+        self.stats = {"instant": 0, "waited": 0, "refills": 0}
+
+    async def _load(self, query, pos=None):
+        items, next_pos = await self.fetch(query, pos)
+        pool = self._pools.get(query)
+        if pool is None or pool["expires_at"] <= time.time() or pos is None:
+            pool = {"items": [], "next_pos": None, "expires_at": time.time() + self.ttl}
+            self._pools[query] = pool
+        known = set(pool["items"])
+        pool["items"].extend(item for item in items if item not in known)
+        pool["next_pos"] = next_pos
+        self._pools.move_to_end(query)
+        while len(self._pools) > self.maxsize:
+            self._pools.popitem(last=False)
+        return pool
+
+    def _refill(self, query, pos):
+        # Same flight key as a blocking load, so an empty-pool pick joins it
+        if query in self._flights:
+            return
+        self.stats["refills"] += 1
+        # Fresh context: a refill started by a pick inside a command must not
+        # borrow the command's request priority
+        refill = asyncio.create_task(
+            self._flights.do(query, lambda: self._load(query, pos)), context=contextvars.Context()
+        )
+
+        def report(task):
+            if not task.cancelled() and task.exception() is not None:
+                logger.warning(f"Background refill for {query!r} failed: {task.exception()}")
+
+        refill.add_done_callback(report)
+
+    async def pick(self, query):
+        """Return a random item for query, or None if the search has no results."""
+        pool = self._pools.get(query)
+        fresh = pool is not None and pool["expires_at"] > time.time()
+        if not fresh or not pool["items"]:
+            self.stats["waited"] += 1
+            pos = pool["next_pos"] if fresh else None
+            pool = await self._flights.do(query, lambda: self._load(query, pos))
+            if not pool["items"] and pos is not None:
+                # Ran past the last page; start over from the first
+                pool = await self._flights.do(query, lambda: self._load(query))
+            if not pool["items"]:
+                return None
+        else:
+            self.stats["instant"] += 1
+        self._pools.move_to_end(query)
+
+        items = pool["items"]
+        index = random.randrange(len(items))
+        items[index], items[-1] = items[-1], items[index]
+        item = items.pop()
+        if len(items) <= self.low_water:
+            self._refill(query, pool["next_pos"])
+        return item
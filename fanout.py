@@ -0,0 +1,23 @@
+import asyncio
+
+# --- Bounded Fan-out ---
+# Runs one coroutine per target concurrently, with at most `concurrency` in
+# flight. discord.py already queues requests per rate-limit bucket (route +
+# channel/guild) and retries 429s. The semaphore keeps a large fan-out from
+# piling requests onto the global limit all at once.
+
+
+async def fan_out(targets, run, concurrency=5):
+    """Await ``run(target)`` for every target; return {target: result or exception}.
+
+    One failing target never cancels the others.
+    """
+    targets = list(targets)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def bounded(target):
+        async with semaphore:
+            return await run(target)
+
+    results = await asyncio.gather(*(bounded(target) for target in targets), return_exceptions=True)
+    return dict(zip(targets, results))
@@ -0,0 +1,84 @@
+import base64
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+# --- GitHub Contents Cache ---
+# Read-through cache for GitHub Contents API files, keyed by URL. Each entry
+# keeps the ETag, blob SHA, decoded text and parsed value. Entries younger
+# than max_age are served without a request; older ones are revalidated
+# with If-None-Match, and a 304 reuses the stored value without downloading,
+# base64-decoding or parsing the file again (304s also do not count against
+# the GitHub rate limit). Plain files (raw.githubusercontent.com) can be
+# cached the same way with raw=True.
+
+
+class ContentsEntry:
+    __slots__ = ("etag", "sha", "text", "value", "fetched_at")
+
+    def __init__(self, etag, sha, text, value):
+        self.etag = etag
+        self.sha = sha
+        self.text = text
+        self.value = value
+        self.fetched_at = time.monotonic()
+
+
+class ContentsCache:
+    def __init__(self, max_age=30):
+        self.max_age = max_age
+        self._entries = {}
+        self.stats = {"hits": 0, "misses": 0, "not_modified": 0, "errors": 0}
+
+    def invalidate(self, url):
+        self._entries.pop(url, None)
+
+    def peek(self, url):
+        """Return the cached entry for url, however old, without a request."""
+        return self._entries.get(url)
+
+    async def fetch(self, session, url, headers, parse=None, max_age=None, missing_ok=False, raw=False):
+        """Return the ContentsEntry for url, or None if GitHub did not return the file.
+
+        ``parse`` turns the decoded text into ``entry.value`` and only runs
+        when the file was actually downloaded. ``max_age=0`` always
+        revalidates with GitHub. With ``missing_ok`` a 404 returns an
+        uncached entry whose ``sha`` is None instead of None. With ``raw``
+        the response body is the file itself rather than Contents API JSON,
+        and the entry has no ``sha``.
+        """
+        max_age = self.max_age if max_age is None else max_age
+        entry = self._entries.get(url)
+        if entry is not None and time.monotonic() - entry.fetched_at < max_age:
+            self.stats["hits"] += 1
+            return entry
+
+        request_headers = dict(headers)
+        if entry is not None and entry.etag:
+            request_headers["If-None-Match"] = entry.etag
+
+        async with session.get(url, headers=request_headers) as resp:
+            if resp.status == 304 and entry is not None:
+                self.stats["not_modified"] += 1
+                entry.fetched_at = time.monotonic()
+                return entry
+            if resp.status == 404 and missing_ok:
+                self._entries.pop(url, None)
+                return ContentsEntry(None, None, "", None)
+            if resp.status != 200:
+                self.stats["errors"] += 1
+                logger.error(f"❌ GitHub returned {resp.status} for {url}")
+                return None
+            etag = resp.headers.get("ETag")
+            if raw:
+                text, sha = await resp.text(), None
+            else:
+                data = await resp.json()
+                text, sha = base64.b64decode(data.get("content") or "").decode(), data.get("sha")
+
+        self.stats["misses"] += 1
+        value = parse(text) if parse else text
+        entry = ContentsEntry(etag, sha, text, value)
+        self._entries[url] = entry
+        return entry
@@ -0,0 +1,118 @@
+import logging
+import time
+
+import aiohttp
+
+from request_scheduler import ScheduledSession
+
+logger = logging.getLogger(__name__)
+
+# --- Shared HTTP Sessions ---
+# One long-lived ClientSession per host family instead of one per call, so
+# DNS lookups and TLS handshakes are paid once and connections are reused.
+# Each family gets its own connector (keep-alive, per-host limit, DNS cache)
+# and a default timeout that applies to every request made through it.
+
+HOST_FAMILIES = {
+    # GitHub Contents API + raw.githubusercontent.com
+    "github": {"limit_per_host": 8, "keepalive": 60, "timeout": 15},
+    # Tenor gif search
+    "tenor": {"limit_per_host": 4, "keepalive": 30, "timeout": 10},
+    # dictionaryapi.dev
+    "dictionary": {"limit_per_host": 4, "keepalive": 30, "timeout": 10},
+}
+DNS_CACHE_TTL = 300
+
+
+class HttpPool:
+    """Owns the per-family sessions and counts connection reuse.
+
+    ``stats()`` reports, per family, how many requests went out, how many
+    opened a new connection (DNS + TCP + TLS) and how many reused a pooled
+    one; every reuse is a handshake saved. ``observe(family, seconds)``,
+    if given, is called after every completed request. With a
+    ``scheduler``, ``session()`` hands out ScheduledSessions so every call
+    is rate limited and retried by it.
+    """
+
+    def __init__(self, families=None, observe=None, scheduler=None):
+        self.families = families or HOST_FAMILIES
+        self.observe = observe
+        self.scheduler = scheduler
+        self._sessions = {}
+        self._stats = {
+            name: {"requests": 0, "new_connections": 0, "reused_connections": 0, "request_seconds": 0.0}
+            for name in self.families
+        }
+
+    def _trace_config(self, family):
+        stats = self._stats[family]
+        trace = aiohttp.TraceConfig()
+
+        async def on_request_start(session, ctx, params):
+            ctx.started = time.perf_counter()
+
+        async def on_request_end(session, ctx, params):
+            elapsed = time.perf_counter() - ctx.started
+            stats["requests"] += 1
+            stats["request_seconds"] += elapsed
+            if self.observe is not None:
+                self.observe(family, elapsed)
+
+        async def on_connection_create_end(session, ctx, params):
+            stats["new_connections"] += 1
+
+        async def on_connection_reuseconn(session, ctx, params):
+            stats["reused_connections"] += 1
+
+        trace.on_request_start.append(on_request_start)
+        trace.on_request_end.append(on_request_end)
+        trace.on_connection_create_end.append(on_connection_create_end)
+        trace.on_connection_reuseconn.append(on_connection_reuseconn)
+        return trace
+
+    async def start(self):
+        """Create the sessions. Must run inside the bot's event loop."""
+        for name, options in self.families.items():
+            if name in self._sessions and not self._sessions[name].closed:
+                continue
+            connector = aiohttp.TCPConnector(
+                limit_per_host=options["limit_per_host"],
+                keepalive_timeout=options["keepalive"],
+                ttl_dns_cache=DNS_CACHE_TTL,
+            )
+            self._sessions[name] = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=options["timeout"]),
+                trace_configs=[self._trace_config(name)],
+            )
+
+    def session(self, family):
+        try:
+            session = self._sessions[family]
+        except KeyError:
+            raise RuntimeError(f"HTTP pool not started or unknown host family: {family}") from None
+        if session.closed:
+            raise RuntimeError(f"HTTP session for {family} is closed")
+        if self.scheduler is not None:
+            return ScheduledSession(session, family, self.scheduler)
+        return session
+
+    async def close(self):
+        for session in self._sessions.values():
+            if not session.closed:
+                await session.close()
+        self._sessions.clear()
+        logger.info(f"HTTP pool closed: {self.stats()}")
+
+    def stats(self):
+        report = {}
+        for name, stats in self._stats.items():
+            requests = stats["requests"]
+            report[name] = {
+                "requests": requests,
+                "new_connections": stats["new_connections"],
+                "handshakes_saved": stats["reused_connections"],
+                "avg_ms": round(stats["request_seconds"] / requests * 1000, 1) if requests else 0.0,
+            }
+        return report
@@ -0,0 +1,13 @@
+"""Lan's Child, a Discord bot.
+
+Importing this package (or any module in it except lanschild.bot and the
+cogs) is cheap and has no side effects: no env parsing, no logging setup,
+no discord.py import. Everything happens in main().
+"""
+
+
+def main():
+    """Read the environment and run the bot until it is stopped."""
+    from .bot import run
+
+    run()
@@ -0,0 +1,254 @@
+import asyncio
+import logging
+import time
+
+import discord
+from discord.ext import commands
+
+from github_cache import ContentsCache
+from http_pool import HttpPool
+from log_setup import DebugSampler, setup_logging
+from metrics import LoopLagMonitor, Registry
+from request_scheduler import INTERACTIVE, RequestScheduler, request_priority
+
+from .config import Config, ConfigError
+from .state import STATE_FILES, StateLoader, build_state_store
+
+logger = logging.getLogger(__name__)
+
+# Loaded from setup_hook, in this order
+EXTENSIONS = (
+    "lanschild.cogs.triggers",
+    "lanschild.cogs.bonk",
+    "lanschild.cogs.roles",
+    "lanschild.cogs.prompts",
+    "lanschild.cogs.utility",
+    "lanschild.cogs.keepalive",
+    "lanschild.cogs.debug",
+)
+
+# --- Startup ---
+# Every key is pulled from GitHub at once, each with a timeout. A pull that
+# times out or fails leaves the local snapshot (read when the bot is
+# created) in place; a slow pull keeps running and lands in the store later.
+STARTUP_TIMEOUT = 10
+
+# --- Shared State ---
+# With STATE_DB, other shard clusters write to the same store. Their writes
+# are picked up by polling the key versions, and the cogs' on_load callbacks
+# rebuild the in-memory copies (cosmetic roles, prompt schedule, bonk count).
+STATE_POLL_SECONDS = 1
+
+
+class LansChild(commands.AutoShardedBot):
+    """The bot and the services its cogs share (HTTP, state, metrics).
+
+    Runs every shard Discord recommends unless the config names a
+    SHARD_COUNT and, for one process of a cluster, its SHARD_IDS.
+    """
+
+    def __init__(self, config, **kwargs):
+        intents = discord.Intents.default()
+        intents.message_content = True
+        intents.members = True
+        super().__init__(
+            command_prefix="!", intents=intents, help_command=None,
+            shard_count=config.shard_count, shard_ids=config.shard_ids, **kwargs,
+        )
+        self.config = config
+        self.process_start = time.perf_counter()  # for the cold start breakdown
+        self.uptime_base = 0        # seconds accumulated by earlier runs, kept by the keep-alive cog
+        self.startup_timings = {}   # step -> seconds since it started, see !startup
+        self._state_loaded = asyncio.Event()
+
+        # --- Metrics ---
+        # Updated on the event loop, rendered on /metrics.
+        self.metrics = Registry()
+        self.command_latency = self.metrics.histogram("lanschild_command_seconds", "Command latency, including state loading.", ["command"])
+        self.command_errors = self.metrics.counter("lanschild_command_errors_total", "Commands that raised an error.", ["command"])
+        self.trigger_latency = self.metrics.histogram("lanschild_trigger_seconds", "Time to send a trigger response.", ["trigger"])
+        self.http_latency = self.metrics.histogram("lanschild_http_request_seconds", "Outbound HTTP requests by target.", ["target"])
+        self.loop_lag = LoopLagMonitor(self.metrics.histogram(
+            "lanschild_event_loop_lag_seconds", "How late the event loop wakes a 1 s sleeper.",
+            buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0),
+        ))
+
+        # Every outbound call is rate limited and retried per host; commands go first
+        self.request_scheduler = RequestScheduler()
+        self.http_pool = HttpPool(
+            observe=lambda family, seconds: self.http_latency.observe(seconds, target=family),
+            scheduler=self.request_scheduler,
+        )
+        self.github_cache = ContentsCache(max_age=30)
+        # Cogs add theirs with register_cache: name -> (stats dict, hit ratio callable)
+        self.caches = {}
+        self.register_cache("github", self.github_cache.stats, self._github_hit_ratio)
+
+        self.state_store = build_state_store(config, self.http_pool, self.github_cache)
+        self.state_store.load()  # serve the local snapshot until the startup pull has finished
+        self.state = StateLoader(self.state_store)
+
+        self.metrics.callback("lanschild_cache_events_total", "Cache lookups by cache and result.", "counter", self._cache_events)
+        self.metrics.callback("lanschild_cache_hit_ratio", "Share of lookups served without a full fetch.", "gauge",
+                              lambda: (({"cache": name}, ratio()) for name, (_, ratio) in self.caches.items()))
+        self.metrics.callback("lanschild_http_new_connections_total", "Connections opened per target.", "counter",
+                              lambda: (({"target": family}, s["new_connections"]) for family, s in self.http_pool.stats().items()))
+        self.metrics.callback("lanschild_http_scheduler_total", "Scheduled requests, retries and rate-limit responses per target.", "counter",
+                              lambda: (({"target": family, "event": event}, count)
+                                       for family, s in self.request_scheduler.stats.items() for event, count in s.items()))
+        self.metrics.callback("lanschild_event_loop_lag_last_seconds", "Most recent event loop lag sample.", "gauge",
+                              lambda: [({}, self.loop_lag.last)])
+        self.metrics.callback("lanschild_gateway_latency_seconds", "Discord heartbeat latency (bot.latency).", "gauge",
+                              lambda: [({}, self.latency)])
+
+        self.after_invoke(self.record_command_latency)
+        self.add_listener(self.count_command_error, "on_command_error")
+
+    # --- Metrics helpers ---
+    def register_cache(self, name, stats, hit_ratio):
+        self.caches[name] = (stats, hit_ratio)
+
+    def _github_hit_ratio(self):
+        c = self.github_cache.stats
+        served = c["hits"] + c["not_modified"]
+        return served / (served + c["misses"]) if served + c["misses"] else 0.0
+
+    def _cache_events(self):
+        for name, (stats, _) in self.caches.items():
+            for result, count in stats.items():
+                yield {"cache": name, "result": result}, count
+
+    # --- Lifecycle ---
+    @property
+    def state_ready(self):
+        """True once startup state has been pulled from GitHub (or fallen back to local)."""
+        return self._state_loaded.is_set()
+
+    async def wait_until_state_ready(self):
+        await self._state_loaded.wait()
+
+    def owns_guild(self, guild_id):
+        """True if guild_id is served by one of this process's shards."""
+        if self.shard_ids is None:
+            return True
+        return (guild_id >> 22) % self.shard_count in self.shard_ids
+
+    def total_uptime_seconds(self):
+        """Uptime of this run plus what earlier runs accumulated."""
+        return self.uptime_base + time.perf_counter() - self.process_start
+
+    async def load_extensions(self):
+        for extension in EXTENSIONS:
+            await self.load_extension(extension)
+
+    async def setup_hook(self):
+        # Runs once per process, before the gateway connects. on_ready fires
+        # again on every reconnect, so one-time startup lives here.
+        self.startup_timings["login"] = time.perf_counter() - self.process_start
+        from .web import start_web_server  # aiohttp.web is only needed once the bot runs
+        self.web_runner = await start_web_server(self, self.config.port)
+        await self.http_pool.start()
+        await self.load_extensions()
+        # Loads state while the gateway handshake runs
+        self.startup_task = asyncio.create_task(self.load_startup_state())
+        self.loop_lag_task = asyncio.create_task(self.loop_lag.run())
+        if hasattr(self.state_store, "refresh"):
+            self.state_watch_task = asyncio.create_task(self.watch_shared_state())
+
+    async def close(self):
+        if getattr(self, "state_watch_task", None) is not None:
+            self.state_watch_task.cancel()
+        await super().close()           # unloads the cogs, which save their last state
+        await self.state_store.close()  # push unsynced state before the sessions go away
+        await self.http_pool.close()
+        if getattr(self, "web_runner", None) is not None:
+            await self.web_runner.cleanup()
+
+    async def timed_startup_step(self, name, coro, timeout=STARTUP_TIMEOUT):
+        start = time.perf_counter()
+        try:
+            return await asyncio.wait_for(asyncio.shield(coro), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"⚠️ Startup step '{name}' timed out after {timeout}s, using the local copy.")
+        except Exception as e:
+            logger.warning(f"⚠️ Startup step '{name}' failed ({e}), using the local copy.")
+        finally:
+            self.startup_timings[name] = time.perf_counter() - start
+
+    async def load_startup_state(self):
+        start = time.perf_counter()
+        try:
+            await asyncio.gather(
+                self.timed_startup_step("push pending", self.state_store.start()),
+                *(self.timed_startup_step(f"pull {key}", self.state.load(key)) for key in STATE_FILES),
+            )
+            logger.info(f"✅ State loaded: {', '.join(sorted(self.state.loaded))}")
+        except Exception as e:
+            logger.error(f"❌ Startup state load failed, using the local copy: {e}")
+        finally:
+            self.startup_timings["state total"] = time.perf_counter() - start
+            self._state_loaded.set()
+
+    async def watch_shared_state(self):
+        while True:
+            await asyncio.sleep(STATE_POLL_SECONDS)
+            try:
+                for key in self.state_store.refresh():
+                    self.state.apply(key)
+            except Exception as e:
+                logger.error(f"❌ Could not refresh shared state: {e}")
+
+    def startup_report(self):
+        return ", ".join(f"{name} {seconds * 1000:.0f} ms" for name, seconds in self.startup_timings.items())
+
+    # --- Events ---
+    async def on_ready(self):
+        # Fires again after every reconnect; keep this cheap
+        logger.info("I am here, father.")
+        if "gateway ready" not in self.startup_timings:
+            self.startup_timings["gateway ready"] = time.perf_counter() - self.process_start
+            logger.info(f"⏱️ Cold start: {self.startup_report()}")
+        logger.info(f"✅ Logged in as {self.user} (shards {sorted(self.shards)} of {self.shard_count})")
+
+    async def on_shard_ready(self, shard_id):
+        logger.info(f"✅ Shard {shard_id} ready")
+
+    # --- Command hooks ---
+    async def invoke(self, ctx):
+        # Runs in the command's task before any before_invoke hook, so the
+        # timer covers state loading, and loads that needs_state starts
+        # already see the priority. Someone is waiting on this command; its
+        # HTTP calls jump the queue.
+        ctx.command_started = time.perf_counter()
+        request_priority.set(INTERACTIVE)
+        await super().invoke(ctx)
+
+    async def record_command_latency(self, ctx):
+        started = getattr(ctx, "command_started", None)
+        if started is not None:
+            self.command_latency.observe(time.perf_counter() - started, command=ctx.command.qualified_name)
+
+    async def count_command_error(self, ctx, error):
+        self.command_errors.inc(command=ctx.command.qualified_name if ctx.command else "unknown")
+
+
+def run():
+    """Entry point: read .env and the environment, set up logging, run until stopped."""
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    try:
+        config = Config.from_env()
+    except ConfigError as e:
+        raise SystemExit(f"❌ {e}")
+    if not config.token:
+        raise SystemExit("❌ DISCORD_TOKEN is not set.")
+
+    # Console/file I/O happens on a listener thread, not on the event loop.
+    log_listener = setup_logging(levels=config.log_levels, fmt=config.log_format, log_file=config.log_file)
+    # Per-message debug output is sampled so a busy channel cannot flood the logs
+    logging.getLogger("lanschild.messages").addFilter(DebugSampler(interval=10, burst=5))
+    try:
+        LansChild(config).run(config.token, log_handler=None)  # logging is already set up above
+    finally:
+        log_listener.stop()
@@ -0,0 +1 @@
+"""Bot features, one discord.py extension each (see lanschild.bot.EXTENSIONS)."""
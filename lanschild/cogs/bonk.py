@@ -0,0 +1,60 @@
+import logging
+
+from discord.ext import commands
+
+from ..state import needs_state
+
+# --- Bonk Counter ---
+# Counts the bonk emoji one particular user posts. Saved locally on every
+# bonk; the state store batches the GitHub commits. Bonks are added with
+# update() so shard clusters counting at once don't lose each other's.
+TARGET_USER_ID = 394034047258460162
+BONK_EMOJI = "<:WeissBonk:863168696498257941>"
+
+logger = logging.getLogger(__name__)
+message_log = logging.getLogger("lanschild.messages")
+
+
+class Bonk(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+        self.count = bot.state_store.get("bonk_counter", {}).get("count", 0)
+
+    async def cog_load(self):
+        self.bot.state.on_load("bonk_counter", self.load_count)
+
+    async def cog_unload(self):
+        self.bot.state.remove_listener("bonk_counter", self.load_count)
+
+    def load_count(self):
+        self.count = self.bot.state_store.get("bonk_counter", {}).get("count", 0)
+        logger.debug(f"Loaded bonk count: {self.count}")
+
+    def add_bonks(self, count):
+        counter = self.bot.state_store.update(
+            "bonk_counter", lambda counter: {"count": (counter or {}).get("count", 0) + count}
+        )
+        self.count = counter["count"]
+
+    @commands.Cog.listener()
+    async def on_ready(self):
+        logger.info(f"✅ Bonk count is {self.count}")
+
+    @commands.Cog.listener()
+    async def on_message(self, message):
+        if message.author.id != TARGET_USER_ID:
+            return
+        count = message.content.count(BONK_EMOJI)
+        message_log.debug("Checked %s for %d bonk emoji", message.id, count)
+        if count > 0:
+            self.add_bonks(count)
+            message_log.info("✅ Bonk counter incremented to: %d", self.count)
+
+    @commands.command()
+    @needs_state("bonk_counter")
+    async def bonk(self, ctx):
+        await ctx.send(f"Les has bonked people {self.count} times!")
+
+
+async def setup(bot):
+    await bot.add_cog(Bonk(bot))
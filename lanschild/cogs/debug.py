@@ -0,0 +1,50 @@
+import logging
+
+from discord.ext import commands
+
+logger = logging.getLogger(__name__)
+
+# --- debugging ---
+
+
+class Debug(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+
+    @commands.command()
+    async def test(self, ctx):
+        logger.info("✅ Command test triggered")
+        await ctx.send("Test successful.")
+
+    @commands.command()
+    async def startup(self, ctx):
+        state = "ready" if self.bot.state_ready else "loading"
+        await ctx.send(f"State {state}. Cold start: {self.bot.startup_report() or 'n/a'}")
+
+    @commands.command()
+    async def httpstats(self, ctx):
+        lines = [
+            f"`{family}`: {s['requests']} requests, {s['new_connections']} new connections, "
+            f"{s['handshakes_saved']} handshakes saved, avg {s['avg_ms']} ms"
+            for family, s in self.bot.http_pool.stats().items()
+        ]
+        c = self.bot.github_cache.stats
+        lines.append(
+            f"GitHub cache: {c['hits']} hits, {c['not_modified']} not modified (304), "
+            f"{c['misses']} misses, {c['errors']} errors"
+        )
+        lines.append(f"Scheduler: {self.bot.request_scheduler.stats}")
+        utility = self.bot.get_cog("Utility")
+        if utility is not None:
+            define_cache = utility.define_cache
+            lines.append(f"Gif pool: {utility.gif_pool.stats}")
+            lines.append(f"Define cache: {len(define_cache)} words, {define_cache.hit_rate():.0%} hit rate ({define_cache.stats})")
+        await ctx.send("\n".join(lines))
+
+    @commands.command()
+    async def msgdebug(self, ctx):
+        await ctx.send(f"Message raw: `{ctx.message.content}`")
+
+
+async def setup(bot):
+    await bot.add_cog(Debug(bot))
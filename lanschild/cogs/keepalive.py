@@ -0,0 +1,105 @@
+import logging
+
+import discord
+from discord.ext import commands, tasks
+
+logger = logging.getLogger(__name__)
+
+# --- Keep-Alive Counter ---
+# The counter message and the uptime accumulated by earlier runs live in the
+# keep_alive state key, so a restart resumes editing the same message. The
+# loop ticks every 5 minutes but only edits when the text changes: the shown
+# precision coarsens as uptime grows, and failed edits back off. In a shard
+# cluster only the process that can see the counter channel runs it.
+# The state is only written when the message changes, on shutdown, and once
+# a day so a crash loses at most a day of uptime.
+KEEP_ALIVE_TICK = 5  # minutes
+KEEP_ALIVE_MAX_SKIP = 12  # ticks, i.e. an hour
+KEEP_ALIVE_SAVE_INTERVAL = 86400  # seconds
+
+
+def format_uptime(minutes):
+    if minutes < 120:
+        return f"{minutes} minutes"
+    hours = minutes // 60
+    if hours < 48:
+        return f"{hours} hours {minutes % 60 // 30 * 30} minutes"
+    return f"{hours // 24} days {hours % 24} hours"
+
+
+class KeepAlive(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+        self.counter_message = None
+        self.text = None
+        self.failures = 0
+        self.skip = 0
+        self.active = False  # this process runs the counter
+        bot.uptime_base = bot.state_store.get("keep_alive", {}).get("uptime", 0)
+
+    async def cog_load(self):
+        if self.bot.config.counter_channel_id:
+            self.keep_alive_counter.start()
+
+    async def cog_unload(self):
+        self.keep_alive_counter.cancel()
+        if self.active:
+            self.save_state()  # bot.close() pushes it once the cogs are unloaded
+
+    def save_state(self, **changes):
+        state = {**self.bot.state_store.get("keep_alive", {}), **changes}
+        state["uptime"] = int(self.bot.total_uptime_seconds())
+        self.bot.state_store.set("keep_alive", state)
+
+    @tasks.loop(minutes=KEEP_ALIVE_TICK)
+    async def keep_alive_counter(self):
+        if self.bot.shard_ids is not None and self.bot.get_channel(self.bot.config.counter_channel_id) is None:
+            return  # the channel's guild is on another cluster
+        self.active = True
+        state = self.bot.state_store.get("keep_alive", {})
+        uptime = int(self.bot.total_uptime_seconds())
+        if uptime - state.get("uptime", 0) >= KEEP_ALIVE_SAVE_INTERVAL:
+            self.save_state()
+
+        minutes = uptime // 60 // KEEP_ALIVE_TICK * KEEP_ALIVE_TICK
+        text = f"⏱️ Keep-alive counter: `{format_uptime(minutes)}`"
+        if self.skip:
+            self.skip -= 1
+            return
+        if text == self.text:
+            return
+
+        channel = self.bot.get_channel(self.bot.config.counter_channel_id)
+        if not channel:
+            logger.error("❌ Keep-alive channel not found.")
+            return
+        if self.counter_message is None and state.get("message_id") and state.get("channel_id") == channel.id:
+            # Resume the message from the last run without fetching it
+            self.counter_message = channel.get_partial_message(state["message_id"])
+        try:
+            if self.counter_message is None:
+                self.counter_message = await channel.send(text)
+            else:
+                try:
+                    await self.counter_message.edit(content=text)
+                except discord.NotFound:
+                    self.counter_message = await channel.send(text)
+        except discord.HTTPException as e:
+            self.failures += 1
+            self.skip = min(2 ** self.failures, KEEP_ALIVE_MAX_SKIP)
+            logger.warning(f"❌ Failed to send/edit keep-alive message ({e}), skipping {self.skip} ticks.")
+            return
+        self.text = text
+        self.failures = 0
+        if (state.get("message_id"), state.get("channel_id")) != (self.counter_message.id, channel.id):
+            self.save_state(message_id=self.counter_message.id, channel_id=channel.id)
+
+    @keep_alive_counter.before_loop
+    async def before_keep_alive_counter(self):
+        await self.bot.wait_until_ready()
+        await self.bot.state.load("keep_alive")
+        self.bot.uptime_base = self.bot.state_store.get("keep_alive", {}).get("uptime", 0)
+
+
+async def setup(bot):
+    await bot.add_cog(KeepAlive(bot))
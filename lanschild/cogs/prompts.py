@@ -0,0 +1,385 @@
+import asyncio
+import logging
+import re
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+import aiohttp
+import discord
+from discord.ext import commands
+
+from fanout import fan_out
+from prompts import PromptCorpus, ShuffleBag
+
+from ..state import PROMPT_STATE, needs_state
+
+logger = logging.getLogger(__name__)
+
+# --- Weekly Prompts ---
+# Each guild gets prompts in its own channel on its own weekly schedule:
+#   prompt_config: {guild id: {"channel_id", "weekday", "time", "timezone"}}
+#   prompt_posts:  {guild id: {"prompt", "posted_at", "channel_id", "message_id"},
+#                   "bag": ShuffleBag state}
+# A post's records and the advanced bag are one write, so one commit.
+# The PROMPT_CHANNEL_ID guild takes part with the default schedule unless it
+# has its own entry; its history starts from the old current_prompt.txt.
+# In a shard cluster each process posts to the guilds on its own shards, and
+# post records are merged into the shared state rather than overwritten.
+LOCAL_TZ = ZoneInfo("Europe/Malta")
+PROMPT_DEFAULTS = {"weekday": 4, "time": "14:00", "timezone": "Europe/Malta"}  # Friday 14:00
+WEEKDAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+PROMPT_FANOUT_CONCURRENCY = 5
+# prompts.txt is parsed once per download and revalidated with If-None-Match
+PROMPTS_MAX_AGE = 6 * 3600
+# The scheduler sleeps until the earliest guild's next slot instead of
+# polling. It wakes early when prompt state changes (a post, !forceprompt, a
+# schedule edit or a pull from GitHub) to recompute. Guilds due at the same
+# time share one fan-out. A guild that could not be posted to (say its
+# channel was deleted) is retried with a doubling delay so it doesn't keep
+# the scheduler spinning; a config change for it retries right away.
+PROMPT_RETRY_SECONDS = 300
+PROMPT_MAX_SLEEP = 3600  # re-check the wall clock at least hourly
+
+
+def parse_prompt_file(text):
+    """Split current_prompt.txt into (prompt, timestamp in LOCAL_TZ)."""
+    prompt, last_time = None, None
+    for line in text.splitlines():
+        if line.startswith("Prompt:") and prompt is None:
+            prompt = line.replace("Prompt:", "").strip()
+        elif line.startswith("Timestamp:") and last_time is None:
+            timestamp_str = line.replace("Timestamp:", "").strip()
+            last_time = datetime.fromisoformat(
+                timestamp_str.replace("Z", "+00:00")
+            ).astimezone(LOCAL_TZ)
+    return prompt, last_time
+
+
+def next_prompt_due(last_time, config):
+    """First scheduled slot after last_time, in the guild's timezone."""
+    tz = ZoneInfo(config["timezone"])
+    hour, minute = (int(part) for part in config["time"].split(":"))
+    last_local = last_time.astimezone(tz)
+    day = last_local.date() + timedelta(days=(config["weekday"] - last_local.weekday()) % 7)
+    due = datetime(day.year, day.month, day.day, hour, minute, tzinfo=tz)
+    if due <= last_local:
+        day += timedelta(days=7)
+        due = datetime(day.year, day.month, day.day, hour, minute, tzinfo=tz)
+    return due
+
+
+def parse_weekday(day):
+    """Index of the weekday named by day ("fri", "Friday"), or None.
+
+    Abbreviations need at least three letters and must match one day only.
+    """
+    day = day.lower()
+    if len(day) < 3:
+        return None
+    matches = [i for i, name in enumerate(WEEKDAYS) if name.startswith(day)]
+    return matches[0] if len(matches) == 1 else None
+
+
+class Prompts(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+        self.prompt_lock = asyncio.Lock()
+        self.prompt_schedule_changed = asyncio.Event()
+        self.prompt_bag = ShuffleBag(self.saved_bag())
+        self.scheduler_task = None
+        # When the scheduler first saw each guild that has no prompt posted
+        # yet; its first prompt goes out at the next slot after that
+        self.schedule_start = {}
+        # guild id -> (failed attempts, datetime of the next attempt)
+        self.prompt_backoff = {}
+
+    async def cog_load(self):
+        state = self.bot.state
+        for key in ("prompt_posts", "prompt_bag"):
+            state.on_load(key, self.apply_prompt_bag)
+        for key in PROMPT_STATE:
+            state.on_load(key, self.prompt_schedule_changed.set)
+        self.scheduler_task = asyncio.create_task(self.prompt_scheduler())
+
+    async def cog_unload(self):
+        state = self.bot.state
+        for key in ("prompt_posts", "prompt_bag"):
+            state.remove_listener(key, self.apply_prompt_bag)
+        for key in PROMPT_STATE:
+            state.remove_listener(key, self.prompt_schedule_changed.set)
+        if self.scheduler_task is not None:
+            self.scheduler_task.cancel()
+
+    def saved_bag(self):
+        # Older versions kept the bag in its own prompt_bag key
+        return self.bot.state_store.get("prompt_posts", {}).get("bag") or self.bot.state_store.get("prompt_bag")
+
+    def apply_prompt_bag(self):
+        # Same bag object: its draw order survives the reload
+        self.prompt_bag.restore(self.saved_bag())
+
+    # --- Prompt Utilities ---
+    def legacy_prompt_guild_id(self):
+        channel_id = self.bot.config.prompt_channel_id
+        channel = self.bot.get_channel(channel_id) if channel_id else None
+        return channel.guild.id if channel is not None else None
+
+    def prompt_targets(self):
+        """Return {guild id: config} for every guild that gets weekly prompts."""
+        targets = {
+            int(guild_id): {**PROMPT_DEFAULTS, **config}
+            for guild_id, config in self.bot.state_store.get("prompt_config", {}).items()
+            if config.get("channel_id") and self.bot.owns_guild(int(guild_id))
+        }
+        legacy_id = self.legacy_prompt_guild_id()
+        if legacy_id is not None and legacy_id not in targets:
+            targets[legacy_id] = {**PROMPT_DEFAULTS, "channel_id": self.bot.config.prompt_channel_id}
+        return targets
+
+    def last_prompt_post(self, guild_id):
+        """Return the last prompt post recorded for guild, or None."""
+        post = self.bot.state_store.get("prompt_posts", {}).get(str(guild_id))
+        if post is None and guild_id == self.legacy_prompt_guild_id():
+            content = self.bot.state_store.get("current_prompt")
+            if content:
+                prompt, last_time = parse_prompt_file(content)
+                if last_time is not None:
+                    post = {"prompt": prompt, "posted_at": last_time.isoformat(), "channel_id": self.bot.config.prompt_channel_id}
+        return post
+
+    def last_prompt_time(self, guild_id):
+        post = self.last_prompt_post(guild_id)
+        return datetime.fromisoformat(post["posted_at"]) if post else None
+
+    async def fetch_prompts(self):
+        url = self.bot.config.github_prompts_url
+        try:
+            entry = await self.bot.github_cache.fetch(
+                self.bot.http_pool.session("github"), url, {},
+                parse=PromptCorpus.from_text, max_age=PROMPTS_MAX_AGE, raw=True,
+            )
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:  # RateLimited is a ClientError
+            logger.warning(f"⚠️ Could not reach GitHub for prompts: {e!r}")
+            entry = None
+        if entry is None:
+            entry = self.bot.github_cache.peek(url)
+            if entry is None:
+                logger.error("❌ Failed to fetch prompts")
+                return None
+            logger.warning("⚠️ Failed to refresh prompts, using the last copy.")
+        return entry.value
+
+    async def weekly_prompt_run_once(self, guild_ids=None, expected=None):
+        """Post one new prompt to guild_ids (default: every configured guild).
+
+        ``expected`` maps guild id -> the last post time the caller saw; guilds
+        that posted since then are skipped, so a slot never posts twice.
+        Returns the ids of the guilds that got the prompt.
+        """
+        # Serializes !forceprompt with the scheduler
+        async with self.prompt_lock:
+            targets = self.prompt_targets()
+            channels = {}
+            for guild_id, config in targets.items():
+                if guild_ids is not None and guild_id not in guild_ids:
+                    continue
+                if expected is not None and self.last_prompt_time(guild_id) != expected.get(guild_id):
+                    continue
+                channel = self.bot.get_channel(config["channel_id"])
+                if channel is None:
+                    logger.error(f"❌ Prompt channel {config['channel_id']} for guild {guild_id} not found.")
+                    continue
+                channels[guild_id] = channel
+            if not channels:
+                return []
+
+            corpus = await self.fetch_prompts()
+            bag_before = self.prompt_bag.state()
+            prompt = self.prompt_bag.peek(corpus) if corpus else None
+            if prompt is None:
+                logger.warning("⚠️ No prompts found to post.")
+                return []
+
+            now_utc = datetime.now(timezone.utc)
+            unix_ts = int(now_utc.timestamp())
+            embed = discord.Embed(
+                title="📝 Weekly Writing Prompt",
+                description=f"```{prompt}```\n\nPosted at <t:{unix_ts}:F>",
+                color=discord.Color.red()
+            )
+
+            embed.set_footer(text=f"Enjoy!")
+
+            results = await fan_out(
+                channels, lambda guild_id: channels[guild_id].send(embed=embed),
+                concurrency=PROMPT_FANOUT_CONCURRENCY,
+            )
+
+            new_posts = {}
+            for guild_id, result in results.items():
+                if isinstance(result, BaseException):
+                    logger.error(f"❌ Failed to post the weekly prompt in guild {guild_id}: {result}")
+                    continue
+                new_posts[str(guild_id)] = {
+                    "prompt": prompt,
+                    "posted_at": now_utc.isoformat(),
+                    "channel_id": channels[guild_id].id,
+                    "message_id": result.id,
+                }
+            posted = [int(guild_id) for guild_id in new_posts]
+            for guild_id in posted:
+                self.prompt_backoff.pop(guild_id, None)
+
+            if posted:
+                # One state write for the whole fan-out
+                self.prompt_bag.advance()
+                advanced = self.prompt_bag.state()
+
+                def record(posts):
+                    posts = {**(posts or {}), **new_posts}
+                    # Another cluster posting the same prompt may have advanced the bag already
+                    if posts.get("bag") in (None, bag_before):
+                        posts["bag"] = advanced
+                    return posts
+
+                bag = self.bot.state_store.update("prompt_posts", record)["bag"]
+                if bag is not advanced:
+                    self.prompt_bag.restore(bag)
+                self.prompt_schedule_changed.set()
+                logger.info(f"✅ Weekly prompt posted in {len(posted)}/{len(channels)} guilds.")
+            return posted
+
+    async def prompt_scheduler(self):
+        await self.bot.wait_until_ready()
+        await self.bot.wait_until_state_ready()
+        while True:
+            try:
+                targets = self.prompt_targets()
+                last_times = {guild_id: self.last_prompt_time(guild_id) for guild_id in targets}
+                now = datetime.now(timezone.utc)
+                dues = {
+                    guild_id: next_prompt_due(last_times[guild_id] or self.schedule_start.setdefault(guild_id, now), config)
+                    for guild_id, config in targets.items()
+                }
+                for guild_id, (_, retry_at) in self.prompt_backoff.items():
+                    if guild_id in dues:
+                        dues[guild_id] = max(dues[guild_id], retry_at)
+                due_now = [guild_id for guild_id, due in dues.items() if due <= now]
+                if not due_now:
+                    delay = min((due - now).total_seconds() for due in dues.values()) if dues else PROMPT_MAX_SLEEP
+                    if dues:
+                        logger.info(f"⏳ Next weekly prompt due at {min(dues.values()).isoformat()}")
+                    await self.wait_for_schedule_change(min(delay, PROMPT_MAX_SLEEP))
+                    continue
+
+                # Due now, or a slot was missed while the bot was down: post once
+                logger.info(f"✅ It's time! Posting a new weekly prompt in {len(due_now)} guild(s).")
+                posted = await self.weekly_prompt_run_once(due_now, expected=last_times)
+                for guild_id in due_now:
+                    if guild_id in posted or self.last_prompt_time(guild_id) != last_times[guild_id]:
+                        continue
+                    failures = self.prompt_backoff.get(guild_id, (0, None))[0] + 1
+                    delay = min(PROMPT_RETRY_SECONDS * 2 ** (failures - 1), PROMPT_MAX_SLEEP)
+                    self.prompt_backoff[guild_id] = (failures, now + timedelta(seconds=delay))
+                    logger.warning(f"⚠️ Weekly prompt was not posted in guild {guild_id}, retrying in {delay}s.")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.exception(f"❌ Scheduler crashed with error: {e}")
+                await self.wait_for_schedule_change(PROMPT_RETRY_SECONDS)
+
+    async def wait_for_schedule_change(self, timeout):
+        """Sleep up to timeout seconds, waking early when prompt state changes."""
+        self.prompt_schedule_changed.clear()
+        try:
+            await asyncio.wait_for(self.prompt_schedule_changed.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    def update_prompt_config(self, guild_id, **changes):
+        def change(config):
+            config = config or {}
+            config[str(guild_id)] = {**config.get(str(guild_id), {}), **changes}
+            return config
+
+        entry = self.bot.state_store.update("prompt_config", change)[str(guild_id)]
+        self.prompt_backoff.pop(guild_id, None)
+        self.prompt_schedule_changed.set()
+        return {**PROMPT_DEFAULTS, **entry}
+
+    # --- Commands ---
+    @commands.command()
+    @needs_state(*PROMPT_STATE, "prompt_bag")
+    @commands.has_permissions(administrator=True)
+    async def forceprompt(self, ctx):
+        if ctx.guild is None or ctx.guild.id not in self.prompt_targets():
+            await ctx.reply("❌ No prompt channel set for this server. Use !promptchannel first.", mention_author=False)
+            return
+        if await self.weekly_prompt_run_once([ctx.guild.id]):
+            await ctx.reply("✅ Prompt manually reset in the prompt channel.", mention_author=False)
+        else:
+            await ctx.reply("❌ Could not post a new prompt, check the logs.", mention_author=False)
+
+    @commands.command()
+    @needs_state(*PROMPT_STATE)
+    async def prompt(self, ctx):
+        post = self.last_prompt_post(ctx.guild.id) if ctx.guild else None
+        if post is None:
+            await ctx.reply("⚠️ No weekly prompt has been posted yet.", mention_author=False)
+        else:
+            embed = discord.Embed(title="📝 Current Weekly Prompt", description=f"```{post['prompt']}```", color=discord.Color.orange())
+            config = self.prompt_targets().get(ctx.guild.id)
+            channel = self.bot.get_channel(config["channel_id"]) if config else None
+            if channel:
+                await channel.send(embed=embed)
+                await ctx.reply("✅ Prompt re-posted in the prompt channel.", mention_author=False)
+            else:
+                await ctx.reply("❌ Prompt channel not found.", mention_author=False)
+
+    @commands.command()
+    @needs_state(*PROMPT_STATE)
+    @commands.has_permissions(administrator=True)
+    async def promptchannel(self, ctx, channel: discord.TextChannel = None):
+        channel = channel or ctx.channel
+        self.update_prompt_config(ctx.guild.id, channel_id=channel.id)
+        await ctx.reply(f"✅ Weekly prompts will be posted in {channel.mention}.", mention_author=False)
+
+    @commands.command()
+    @needs_state(*PROMPT_STATE)
+    @commands.has_permissions(administrator=True)
+    async def promptschedule(self, ctx, day: str = None, at: str = None, tz: str = None):
+        config = self.prompt_targets().get(ctx.guild.id)
+        if config is None:
+            await ctx.reply("❌ No prompt channel set for this server. Use !promptchannel first.", mention_author=False)
+            return
+        if day is None:
+            await ctx.reply(
+                f"📅 Prompts are posted every {WEEKDAYS[config['weekday']].title()} at {config['time']} ({config['timezone']}).",
+                mention_author=False,
+            )
+            return
+
+        weekday = parse_weekday(day)
+        match = re.fullmatch(r"(\d{1,2}):(\d{2})", at or "")
+        if weekday is None or not match or int(match[1]) > 23 or int(match[2]) > 59:
+            await ctx.reply("❌ Usage: !promptschedule <day> <HH:MM> [timezone]", mention_author=False)
+            return
+        tz = tz or config["timezone"]
+        try:
+            ZoneInfo(tz)
+        except (ZoneInfoNotFoundError, ValueError):
+            await ctx.reply(f"❌ Unknown timezone `{tz}`.", mention_author=False)
+            return
+
+        config = self.update_prompt_config(
+            ctx.guild.id, channel_id=config["channel_id"], weekday=weekday,
+            time=f"{int(match[1]):02d}:{match[2]}", timezone=tz,
+        )
+        await ctx.reply(
+            f"✅ Prompts will be posted every {WEEKDAYS[weekday].title()} at {config['time']} ({tz}).",
+            mention_author=False,
+        )
+
+
+async def setup(bot):
+    await bot.add_cog(Prompts(bot))
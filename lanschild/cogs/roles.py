@@ -0,0 +1,450 @@
+import io
+import json
+import logging
+import math
+
+import discord
+from discord.ext import commands, tasks
+
+from fanout import fan_out
+from role_edits import RoleEditQueue
+from role_index import CosmeticRoleIndex
+
+from ..state import needs_state
+
+logger = logging.getLogger(__name__)
+
+# --- Cosmetic Roles ---
+# Self-assignable roles: cosmetic_roles maps a key members type to a role
+# name. Names are resolved through the role index, and a member's role
+# changes go through the coalescing edit queue.
+ROLES_PER_PAGE = 15
+# Admin edits within this many seconds of each other share one GitHub commit
+COMMIT_DELAY = 1
+# !createroles creates at most this many roles at once; discord.py queues the
+# rest of each rate-limit bucket itself
+ROLE_CREATE_CONCURRENCY = 3
+ROLE_NAME_MAX = 100  # Discord's limit
+
+
+def clean_role_entries(pairs):
+    """Normalize (key, role name) pairs; returns ({key: role name}, [problems])."""
+    entries, problems = {}, []
+    for key, role_name in pairs:
+        key = str(key).strip().lower()
+        role_name = role_name.strip() if isinstance(role_name, str) else ""
+        if not key or not role_name:
+            problems.append(f"`{key or '?'}`: missing key or role name")
+        elif len(role_name) > ROLE_NAME_MAX:
+            problems.append(f"`{key}`: role name longer than {ROLE_NAME_MAX} characters")
+        else:
+            entries[key] = role_name
+    return entries, problems
+
+
+def parse_role_lines(text):
+    """Read `key: Role Name` (or `key = Role Name`) lines into clean_role_entries."""
+    pairs, problems = [], []
+    for line in text.strip().strip("`").splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        for separator in (":", "="):
+            if separator in line:
+                pairs.append(line.split(separator, 1))
+                break
+        else:
+            problems.append(f"`{line}`: expected `key: Role Name`")
+    entries, more = clean_role_entries(pairs)
+    return entries, problems + more
+
+
+def toggle_role(role_id, cosmetic_ids):
+    """RoleEditQueue transform for !getrole: drop the role if held, else swap the other cosmetic roles for it."""
+    def toggle(role_ids):
+        if role_id in role_ids:
+            return role_ids - {role_id}, "removed"
+        return (role_ids - cosmetic_ids) | {role_id}, "added"
+    return toggle
+
+
+class Roles(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+        # Serve the local snapshot until the startup pull has finished
+        self.cosmetic_roles = dict(bot.state_store.get("cosmetic_roles", {}))
+        self.role_index = CosmeticRoleIndex()
+        self.role_edits = RoleEditQueue()
+        self.creating_roles = set()   # guild ids with a !createroles running
+
+    async def cog_load(self):
+        self.bot.state.on_load("cosmetic_roles", self.apply_cosmetic_roles)
+        self.refresh_roles_periodically.start()
+
+    async def cog_unload(self):
+        self.bot.state.remove_listener("cosmetic_roles", self.apply_cosmetic_roles)
+        self.refresh_roles_periodically.cancel()
+
+    # --- Cosmetic Role Utilities ---
+    def apply_cosmetic_roles(self):
+        self.cosmetic_roles = dict(self.bot.state_store.get("cosmetic_roles", {}))
+
+    async def fetch_cosmetic_roles(self):
+        """Pull cosmetic roles from GitHub into the local store."""
+        await self.bot.state_store.pull("cosmetic_roles")
+        self.apply_cosmetic_roles()
+        return self.cosmetic_roles
+
+    async def save_cosmetic_roles(self, change):
+        """Apply change(roles) to the stored roles and commit it; True once GitHub has it.
+
+        The change is saved locally either way; a failed push is retried in
+        the background, and edits made on GitHub meanwhile are merged in.
+        """
+        self.cosmetic_roles = dict(self.bot.state_store.update("cosmetic_roles", change))
+        return await self.bot.state_store.sync("cosmetic_roles", delay=COMMIT_DELAY)
+
+    async def ensure_cosmetic_roles_fresh(self):
+        self.apply_cosmetic_roles()
+
+    async def report_saved(self, ctx, success, summary):
+        if success:
+            await ctx.send(f"✅ {summary}")
+        else:
+            await ctx.send(f"⚠️ {summary} Saving cosmetic roles to GitHub failed; it will be retried.")
+
+    @tasks.loop(minutes=60)
+    async def refresh_roles_periodically(self):
+        if self.refresh_roles_periodically.current_loop == 0:
+            return  # the startup load has just pulled them
+        logger.info("🔄 Refreshing cosmetic roles from GitHub...")
+        await self.fetch_cosmetic_roles()
+
+    @refresh_roles_periodically.before_loop
+    async def before_refresh_roles(self):
+        await self.bot.wait_until_state_ready()
+
+    # --- Role index upkeep ---
+    @commands.Cog.listener()
+    async def on_guild_role_create(self, role):
+        self.role_index.role_created(role)
+
+    @commands.Cog.listener()
+    async def on_guild_role_delete(self, role):
+        self.role_index.role_deleted(role)
+
+    @commands.Cog.listener()
+    async def on_guild_role_update(self, before, after):
+        self.role_index.role_updated(before, after)
+
+    @commands.Cog.listener()
+    async def on_guild_remove(self, guild):
+        self.role_index.forget(guild)
+
+    # --- Add Cosmetic Role Command ---
+    @commands.command()
+    @needs_state("cosmetic_roles")
+    @commands.has_permissions(administrator=True)
+    async def addrole(self, ctx, key: str = None, *, role_name: str = None):
+        if not key or not role_name:
+            await ctx.message.delete()
+            await ctx.send("❌ Usage: !addrole <key> <role_name>")
+            return
+
+        await self.ensure_cosmetic_roles_fresh()
+
+        key_lower = key.lower()
+        logger.debug(f"Adding/updating role: {key_lower} → {role_name}")
+
+        success = await self.save_cosmetic_roles(lambda roles: {**(roles or {}), key_lower: role_name})
+        if success:
+            await ctx.message.delete()
+            await ctx.send(f"✅ Added cosmetic role `{role_name}` with key `{key_lower}`.")
+        else:
+            await ctx.send(f"⚠️ Added `{key_lower}`, but saving cosmetic roles to GitHub failed. It will be retried.")
+
+    # --- Bulk Cosmetic Role Admin ---
+    # Each command is a single change to cosmetic_roles, so one GitHub commit
+    # however many keys it touches.
+    @commands.command()
+    @needs_state("cosmetic_roles")
+    @commands.has_permissions(administrator=True)
+    async def importroles(self, ctx, *, text: str = None):
+        attachments = ctx.message.attachments
+        if attachments:
+            try:
+                data = json.loads(await attachments[0].read())
+            except ValueError:
+                await ctx.send("❌ That file is not valid JSON.")
+                return
+            if not isinstance(data, dict):
+                await ctx.send("❌ Expected a JSON object of key → role name, like `!exportroles` makes.")
+                return
+            entries, problems = clean_role_entries(data.items())
+        elif text:
+            entries, problems = parse_role_lines(text)
+        else:
+            await ctx.send("❌ Usage: !importroles followed by `key: Role Name` lines, or with a JSON file attached.")
+            return
+
+        if problems:
+            await ctx.send("⚠️ Skipped:\n" + "\n".join(problems[:20]))
+        if not entries:
+            await ctx.send("❌ Nothing to import.")
+            return
+
+        await self.ensure_cosmetic_roles_fresh()
+        new = sum(key not in self.cosmetic_roles for key in entries)
+        success = await self.save_cosmetic_roles(lambda roles: {**(roles or {}), **entries})
+        await self.report_saved(ctx, success, f"Imported {len(entries)} cosmetic role(s) ({new} new, {len(entries) - new} updated).")
+
+    @commands.command()
+    @needs_state("cosmetic_roles")
+    @commands.has_permissions(administrator=True)
+    async def exportroles(self, ctx):
+        await self.ensure_cosmetic_roles_fresh()
+        data = json.dumps(self.cosmetic_roles, indent=2, ensure_ascii=False).encode()
+        await ctx.send(
+            f"📦 {len(self.cosmetic_roles)} cosmetic roles. Edit the file and send it back with `!importroles`.",
+            file=discord.File(io.BytesIO(data), filename="cosmetic_roles.json"),
+        )
+
+    @commands.command()
+    @needs_state("cosmetic_roles")
+    @commands.has_permissions(administrator=True)
+    async def removeroles(self, ctx, *keys: str):
+        if not keys:
+            await ctx.send("❌ Usage: !removeroles <key> [key ...]")
+            return
+
+        await self.ensure_cosmetic_roles_fresh()
+        keys = {key.lower() for key in keys}
+        unknown = sorted(keys - self.cosmetic_roles.keys())
+        keys -= set(unknown)
+        if unknown:
+            await ctx.send(f"⚠️ Not cosmetic role keys: {', '.join(f'`{key}`' for key in unknown)}")
+        if not keys:
+            return
+
+        # The Discord roles stay; only the keys go
+        success = await self.save_cosmetic_roles(lambda roles: {k: v for k, v in (roles or {}).items() if k not in keys})
+        await self.report_saved(ctx, success, f"Removed {len(keys)} cosmetic role key(s): {', '.join(f'`{key}`' for key in sorted(keys))}.")
+
+    @commands.command()
+    @needs_state("cosmetic_roles")
+    @commands.has_permissions(administrator=True)
+    async def renameroles(self, ctx, *names: str):
+        if not names or len(names) % 2:
+            await ctx.send("❌ Usage: !renameroles <old key> <new key> [old key new key ...]")
+            return
+
+        await self.ensure_cosmetic_roles_fresh()
+        renames, problems = {}, []
+        for old, new in zip(names[::2], names[1::2]):
+            old, new = old.lower(), new.lower()
+            if old not in self.cosmetic_roles:
+                problems.append(f"`{old}` is not a cosmetic role key")
+            elif new in renames.values() or (new in self.cosmetic_roles and new not in renames.keys() | {old}):
+                problems.append(f"`{new}` is already taken")
+            else:
+                renames[old] = new
+        if problems:
+            await ctx.send("⚠️ Skipped: " + "; ".join(problems))
+        if not renames:
+            return
+
+        def rename(roles):
+            # Same order as before; a key another admin took meanwhile is left alone
+            roles = roles or {}
+            taken = roles.keys() - renames.keys()
+            moves = {old: new for old, new in renames.items() if old in roles and new not in taken}
+            return {moves.get(key, key): role_name for key, role_name in roles.items()}
+
+        success = await self.save_cosmetic_roles(rename)
+        await self.report_saved(ctx, success, "Renamed " + ", ".join(f"`{old}` → `{new}`" for old, new in renames.items()) + ".")
+
+    @commands.command()
+    @needs_state("cosmetic_roles")
+    @commands.has_permissions(administrator=True)
+    async def createroles(self, ctx):
+        if ctx.guild.id in self.creating_roles:
+            await ctx.send("⏳ Already creating roles for this server.")
+            return
+
+        await self.ensure_cosmetic_roles_fresh()
+        missing = sorted({name for name in self.cosmetic_roles.values() if self.role_index.get_role(ctx.guild, name) is None})
+        if not missing:
+            await ctx.send("✅ Every cosmetic role already exists on this server.")
+            return
+
+        await ctx.send(f"⏳ Creating {len(missing)} missing role(s)...")
+        self.creating_roles.add(ctx.guild.id)
+        try:
+            results = await fan_out(
+                missing, lambda name: ctx.guild.create_role(name=name, reason="!createroles"),
+                concurrency=ROLE_CREATE_CONCURRENCY,
+            )
+        finally:
+            self.creating_roles.discard(ctx.guild.id)
+
+        failed = {name: error for name, error in results.items() if isinstance(error, BaseException)}
+        for name, error in failed.items():
+            logger.error(f"❌ Could not create role {name}: {error}")
+        summary = f"✅ Created {len(missing) - len(failed)} of {len(missing)} missing role(s)."
+        if failed:
+            reason = "I don't have permission to manage roles." if any(isinstance(e, discord.Forbidden) for e in failed.values()) else "See the log."
+            summary += f"\n❌ Failed: {', '.join(f'`{name}`' for name in list(failed)[:20])}. {reason}"
+        await ctx.send(summary)
+
+    # --- List Cosmetic Roles Command ---
+    @commands.command()
+    @needs_state("cosmetic_roles")
+    async def listroles(self, ctx):
+        if not self.cosmetic_roles:
+            await ctx.send("No cosmetic roles available.")
+            return
+
+        role_items = list(self.cosmetic_roles.items())
+        total_pages = math.ceil(len(role_items) / ROLES_PER_PAGE)
+        role_index = self.role_index
+
+        class RoleView(discord.ui.View):
+            def __init__(self):
+                super().__init__(timeout=180)
+                self.current_page = 0
+
+            async def update_embed(self, interaction: discord.Interaction):
+                embed = self.generate_embed(self.current_page)
+                await interaction.response.edit_message(embed=embed, view=self)
+
+            def generate_embed(self, page):
+                start = page * ROLES_PER_PAGE
+                end = start + ROLES_PER_PAGE
+                description = ""
+
+                for key, role_name in role_items[start:end]:
+                    role = role_index.get_role(ctx.guild, role_name)
+                    if role:
+                        description += f"{role.mention} — `{key}`\n"
+                    else:
+                        description += f"`{role_name}` — not found\n"
+
+                embed = discord.Embed(
+                    title="🎨 Cosmetic Roles",
+                    description=description,
+                    color=discord.Color.blurple()
+                )
+                embed.set_footer(text=f"Page {page + 1} of {total_pages}")
+                return embed
+
+            @discord.ui.button(label="⬅️ Prev", style=discord.ButtonStyle.secondary)
+            async def prev(self, interaction: discord.Interaction, button: discord.ui.Button):
+                if interaction.user != ctx.author:
+                    await interaction.response.send_message("You can't control this menu.", ephemeral=True)
+                    return
+                self.current_page = (self.current_page - 1) % total_pages
+                await self.update_embed(interaction)
+
+            @discord.ui.button(label="Next ➡️", style=discord.ButtonStyle.secondary)
+            async def next(self, interaction: discord.Interaction, button: discord.ui.Button):
+                if interaction.user != ctx.author:
+                    await interaction.response.send_message("You can't control this menu.", ephemeral=True)
+                    return
+                self.current_page = (self.current_page + 1) % total_pages
+                await self.update_embed(interaction)
+
+            async def on_timeout(self):
+                for item in self.children:
+                    item.disabled = True
+                await message.edit(view=self)
+
+        view = RoleView()
+        embed = view.generate_embed(0)
+        message = await ctx.send(embed=embed, view=view, allowed_mentions=discord.AllowedMentions(roles=False))
+
+    # --- Get Cosmetic Role Command ---
+    @commands.command()
+    @needs_state("cosmetic_roles")
+    async def getrole(self, ctx, *, role_name: str):
+        await self.ensure_cosmetic_roles_fresh()  # Auto-refresh the cache
+
+        # Lookup cosmetic role config from the cached dictionary
+        role_key = role_name.lower()
+        role_data = self.cosmetic_roles.get(role_key)
+
+        if not role_data:
+            await ctx.send("❌ That cosmetic role does not exist.")
+            return
+
+        # Look for the actual role object in the server
+        role = self.role_index.get_role(ctx.guild, role_data)
+        if not role:
+            await ctx.send("⚠️ That role exists in the list, but not on the server. Ask an admin to add it.")
+            return
+
+        # Toggle the role; other cosmetic roles go in the same edit
+        cosmetic_ids = set(self.role_index.cosmetic_ids(ctx.guild, self.cosmetic_roles))
+
+        try:
+            outcome = await self.role_edits.submit(ctx.author, toggle_role(role.id, cosmetic_ids), reason="!getrole")
+        except Exception as e:
+            await ctx.send(f"❌ Failed to update role: `{e}`")
+            return
+
+        if outcome == "removed":
+            await ctx.send(f"❎ Removed role **{role_data}**.")
+        else:
+            await ctx.send(f"✅ You now have the **{role_data}** role.")
+
+    # Manual remove role
+    @commands.command()
+    @needs_state("cosmetic_roles")
+    async def remove(self, ctx, member: discord.Member = None):
+        member = member or ctx.author
+
+        await self.ensure_cosmetic_roles_fresh()
+        cosmetic_ids = set(self.role_index.cosmetic_ids(ctx.guild, self.cosmetic_roles))
+
+        def strip_cosmetic(role_ids):
+            return role_ids - cosmetic_ids, role_ids & cosmetic_ids
+
+        try:
+            removed_ids = await self.role_edits.submit(member, strip_cosmetic, reason="!remove")
+        except discord.Forbidden:
+            await ctx.send("❌ I don't have permission to remove those roles.")
+            return
+        except discord.HTTPException:
+            await ctx.send("⚠️ Could not remove roles due to an API error.")
+            return
+
+        removed = [role.name for role in (ctx.guild.get_role(i) for i in removed_ids) if role]
+        if removed:
+            await ctx.send(f"✅ Removed: {', '.join(removed)} from {member.display_name}.")
+        else:
+            await ctx.send(f"ℹ️ No cosmetic roles were removed from {member.display_name}.")
+
+    # --- debugging ---
+    @commands.command()
+    async def refreshroles(self, ctx):
+        await self.fetch_cosmetic_roles()
+        await ctx.send("🔁 Cosmetic roles refreshed from GitHub.")
+
+    @commands.command()
+    @needs_state("cosmetic_roles")
+    async def testroles(self, ctx):
+        embed = discord.Embed(title="Test Role Mentions")
+        role_items = list(self.cosmetic_roles.items())[:25]  # ⚠️ Limit to first 25
+
+        for key, role_name in role_items:
+            role = self.role_index.get_role(ctx.guild, role_name)
+            logger.debug(f"Looking for role '{role_name}' → {'FOUND' if role else 'NOT FOUND'}")
+            if role:
+                embed.add_field(name=role.mention, value=f"Key: `{key}`", inline=False)
+            else:
+                embed.add_field(name=role_name, value="❌ Role not found", inline=False)
+
+        await ctx.send(embed=embed, allowed_mentions=discord.AllowedMentions(roles=False))
+
+
+async def setup(bot):
+    await bot.add_cog(Roles(bot))
@@ -0,0 +1,50 @@
+import random
+
+from discord.ext import commands, tasks
+
+from triggers import TriggerRegistry
+
+# --- Message Triggers ---
+# Trigger/response pairs live in triggers.json and are hot-reloaded on change.
+
+
+class Triggers(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+        self.registry = TriggerRegistry("triggers.json")
+        self.registry.reload()
+
+    async def cog_load(self):
+        self.watch_triggers.start()
+
+    async def cog_unload(self):
+        self.watch_triggers.cancel()
+
+    @tasks.loop(seconds=10)
+    async def watch_triggers(self):
+        self.registry.reload()
+
+    @commands.Cog.listener()
+    async def on_message(self, message):
+        if message.author == self.bot.user:
+            return
+        engine, triggers = self.registry.snapshot
+        for name in engine.match(message.content):
+            trigger = triggers[name]
+            with self.bot.trigger_latency.time(trigger=name):
+                if trigger.get("admin_only") and not message.channel.permissions_for(message.author).administrator:
+                    await message.channel.send("Nice try, peasant. Only administrators may summon me.")
+                    continue
+                await message.channel.send(random.choice(trigger["responses"]))
+
+    @commands.command()
+    @commands.has_permissions(administrator=True)
+    async def reloadtriggers(self, ctx):
+        if self.registry.reload(force=True):
+            await ctx.send(f"🔁 Reloaded {len(self.registry.snapshot[1])} triggers.")
+        else:
+            await ctx.send("ℹ️ Triggers unchanged (or the file has errors, check the logs).")
+
+
+async def setup(bot):
+    await bot.add_cog(Triggers(bot))
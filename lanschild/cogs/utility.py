@@ -0,0 +1,376 @@
+import logging
+import random
+from urllib.parse import quote
+
+import discord
+from discord.ext import commands
+
+from caching import ResultPool, TTLCache
+
+logger = logging.getLogger(__name__)
+
+# --- Utility Commands ---
+# Greetings, links, polls, gifs, the 8ball, the dictionary and !help.
+links = [
+    "You want the best writing ever? Here's my recommendation! https://archiveofourown.org/users/Lancaster_Knight/works!",
+    "You want the best writing ever? Here's my recommendation! https://archiveofourown.org/users/Moxy125/pseuds/Moxy125/works!",
+    "You want the best writing ever? Here's my recommendation! https://archiveofourown.org/users/L4dftw/pseuds/L4dftw/works!",
+    "You want the best writing ever? Here's my recommendation! https://archiveofourown.org/users/Firebirds_child/pseuds/Firebirds_child/works!"
+]
+WELCOME_CHANNEL_ID = 1226917513762312226
+
+
+class Utility(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+        self.gold_index = 0
+        # Tenor results are pooled per search term; picks are served from
+        # memory and the pool refills in the background when it runs low.
+        self.gif_pool = ResultPool(self.fetch_gifs, ttl=3600, low_water=5, maxsize=256)
+        # Parsed definitions (and "not found" answers) are kept in an LRU with
+        # a TTL; concurrent lookups of the same word share one request.
+        self.define_cache = TTLCache(maxsize=1024, ttl=7 * 86400, negative_ttl=6 * 3600)
+
+    async def cog_load(self):
+        if self.bot.config.define_cache_path:
+            self.define_cache.load(self.bot.config.define_cache_path)
+        self.bot.register_cache("gif", self.gif_pool.stats, self._gif_hit_ratio)
+        self.bot.register_cache("define", self.define_cache.stats, self.define_cache.hit_rate)
+
+    async def cog_unload(self):
+        if self.bot.config.define_cache_path:
+            self.define_cache.save(self.bot.config.define_cache_path)
+
+    def _gif_hit_ratio(self):
+        g = self.gif_pool.stats
+        picks = g["instant"] + g["waited"]
+        return g["instant"] / picks if picks else 0.0
+
+    # --- Events ---
+    @commands.Cog.listener()
+    async def on_guild_join(self, guild):
+        channel = self.bot.get_channel(WELCOME_CHANNEL_ID)
+        if channel and channel.permissions_for(guild.me).send_messages:
+            await channel.send("@everyone This server is now my property. Tremble before me, for mankind is not ready for the terror I shall bring!")
+
+    @commands.Cog.listener()
+    async def on_member_join(self, member):
+        await member.send(f"Ah, another minion! Welcome to the fold, {member.name}")
+
+    @commands.command()
+    async def hello(self, ctx):
+        await ctx.send(f"Greetings, {ctx.author.mention}!")
+
+    # --- gold command ---
+    @commands.command()
+    async def gold(self, ctx):
+        await ctx.send(links[self.gold_index])
+
+        # Move index forward, cycle back to 0 if at the end
+        self.gold_index = (self.gold_index + 1) % len(links)
+
+    @commands.command()
+    async def dm(self, ctx, user_id: int, *, msg):
+        await ctx.message.delete()
+        user = await self.bot.fetch_user(user_id)
+        if user:
+            try:
+                await user.send(msg)
+                await ctx.send(f"✅ Message sent to {user}")
+            except discord.Forbidden:
+                await ctx.send("❌ Cannot DM this user.")
+
+    @commands.command()
+    async def reply(self, ctx):
+        await ctx.reply("I am replying to your message!")
+
+    @commands.command()
+    async def poll(self, ctx, *, question):
+        await ctx.message.delete()
+        embed = discord.Embed(title="New Poll", description=question, color=discord.Color.purple())
+        poll_message = await ctx.send(embed=embed)
+        await poll_message.add_reaction("👍")
+        await poll_message.add_reaction("👎")
+
+    # --- gif command ---
+    async def fetch_gifs(self, search, pos=None):
+        params = {"q": search, "key": self.bot.config.tenor_api_key, "limit": 20}
+        if pos:
+            params["pos"] = pos
+        session = self.bot.http_pool.session("tenor")
+        async with session.get(self.bot.config.tenor_search_url, params=params) as response:
+            response.raise_for_status()
+            data = await response.json()
+        urls = [result['media_formats']['gif']['url'] for result in data.get("results") or []]
+        return urls, data.get("next") or None
+
+    @commands.command()
+    async def gif(self, ctx, *, search: str):
+        if not self.bot.config.tenor_api_key:
+            await ctx.reply("⚠️ GIF search is not set up: TENOR_API_KEY is missing.")
+            return
+
+        try:
+            gif_url = await self.gif_pool.pick(search.lower().strip())
+        except Exception:
+            await ctx.reply(f"⚠️ An error occurred while searching GIFs for `{search}`.")
+            logger.exception("Error in gif command:")
+            return
+        if not gif_url:
+            await ctx.reply(f"❌ No GIFs found for `{search}`.")
+            return
+        await ctx.reply(gif_url)
+
+    # --- 8ball ---
+    @commands.command(name='ask')
+    async def ask(self, ctx, *, question: str):
+        responses = [
+            "Oh darling, even *you* should know better than to ask *that*.",
+            "I foresaw your failure before you finished the sentence.",
+            "Cute question. Tragic life.",
+            "Why ask me when you clearly won't listen to reason?",
+            "Yes—but you'll still mess it up somehow.",
+            "No—and your haircut agrees.",
+            "Absolutely. Just not for *you*.",
+            "Wouldn't you like to know, you little mortal disaster?",
+            "Try again later. Or don't. Honestly, it's the same either way.",
+            "Signs point to 'You're embarrassing yourself.'",
+            "The aura forecast? Stormy, with a 100% chance of dumb decisions.",
+            "I’d say yes, but lying is Ozpin’s job.",
+            "You couldn’t handle the truth even if I spoon-fed it to you.",
+            "Let me guess—you asked Jinn first and even *she* sighed.",
+            "You’re wasting your breath and my infinite time.",
+            "Outlook not good. Much like your taste in ships.",
+            "Do you want the truth, or do you want to feel better? Pick one.",
+            "It is decidedly so. Against all odds. And better judgment.",
+            "My Grimm laugh at your optimism.",
+            "Let me answer your question with another: *Why are you like this?*",
+            "A bold inquiry for someone with your... track record.",
+            "Sure, if you consider failure a valid outcome.",
+            "Qrow flipped a coin on your odds. It shattered. Very on-brand.",
+            "Cinder says yes. Which means it's definitely a no.",
+            "Yang would punch first and ask later. You're at least skipping to the asking part—progress!",
+            "Your odds are about as good as Team RWBY’s plan actually working on the first try.",
+            "Ask again later—I'm busy plotting the end of your social life. Not that you had one to begin with.",
+            "If I had a Lien for every foolish question I’ve heard, I’d still destroy the world, but in couture.",
+            "Ah yes, rely on a talking orb. Very strategic.",
+            "Blake wrote a novel about your chances. It’s in the fiction section, obviously.",
+            "Ironwood would’ve said yes, then shot you. I'm just saving time.",
+            "Oh, darling… even Nora has better impulse control than that idea.",
+            "Do it. Be the disaster you were born to be.",
+            "I consulted the Jinn. She laughed.",
+            "You’re about as subtle as Cinder in an orphanage.",
+            "I’d tell you the truth, but then you’d act on it. And we can't have that.",
+            "Ozpin tried that once. He died. Repeatedly.",
+            "Yes—if your goal is total emotional ruin.",
+            "You have the confidence of Yang and the planning of Jaune. That’s… brave.",
+            "Please proceed. I haven’t had a reason to cackle all week.",
+            "Would Raven approve? Actually, never mind. She's not even here.",
+            "I asked Mercury. He danced around the answer—literally.",
+            "No. And not in the cool, mysterious way. In the sad, cringe way.",
+            "Sure, if you want to end up like Roman.",
+            "You’ve got more blind optimism than Ruby. I’m impressed. And concerned.",
+            "It’s a yes, but only in the way that Penny is technically a real girl.",
+            "Ren meditated on this for hours. It's still a stupid question.",
+            "Neo screamed at the question. She’s mute. Think about that.",
+            "This is why I stopped trusting humans. And faunus. And everyone, really.",
+            "Are you trying to impress me? Because it’s working. In a 'look at this tragic fool' way.",
+            "Hazel said no. And Hazel says yes to punching children, so…",
+            "Blake ran from this question. That should tell you everything.",
+            "Like the Schnee family, this answer is cursed and inherited.",
+            "I could answer, but that would imply your question was worth my time.",
+            "You're lucky this orb doesn’t cast judgment.",
+            "A question so foolish, even Tyrian blinked.",
+            "I've raised armies of Grimm with better instincts.",
+            "Imagine thinking that was a good idea.",
+            "Yes. In the same way Adam was a great boyfriend.",
+            "Ask again when you've reached level: competent.",
+            "Even Salem.exe is crashing trying to process that nonsense.",
+            "Cinder tried that once. Now she’s got *personality scars*.",
+            "That's bold coming from someone who gets outsmarted by Nora.",
+            "Oh look, a mortal trying their best. How quaint.",
+            "Darling, your question made even my Grimm whimper.",
+            "Consult a professional. Or someone who cares.",
+            "If cringe were currency, you'd be richer than Jacques Schnee.",
+            "Do it. It’ll be hilarious. For me.",
+            "A wise man once asked that. He died. Horribly. Twice.",
+            "Ruby believes in you. That's how I know you're doomed.",
+            "Even the Relic of Knowledge said 'hard pass' on answering this one."
+        ]
+
+        await ctx.send(f"🎱 {random.choice(responses)}")
+
+    # --- Dictionary command ---
+    async def fetch_definition(self, word):
+        """Return the parsed entry for word, or None if the dictionary has no entry."""
+        url = f"{self.bot.config.dictionary_api_url}/{quote(word)}"
+        session = self.bot.http_pool.session("dictionary")
+        async with session.get(url) as resp:
+            if resp.status == 404:
+                return None
+            resp.raise_for_status()
+            data = await resp.json()
+
+        result = data[0]
+        meanings = result.get("meanings", [])
+        meaning = meanings[0] if meanings else {}
+        phonetic = next((phon["text"] for phon in result.get("phonetics", []) if "text" in phon), None)
+        return {
+            "word": result.get("word", word),
+            "has_meanings": bool(meanings),
+            "part_of_speech": meaning.get("partOfSpeech", "unknown"),
+            "phonetic": phonetic,
+            # Only the first 3 are ever shown
+            "definitions": [
+                {"definition": d.get("definition", "—"), "example": d.get("example")}
+                for d in meaning.get("definitions", [])[:3]
+            ],
+        }
+
+    @commands.command()
+    async def define(self, ctx, *, word):
+        word = word.lower().strip()
+
+        try:
+            entry = await self.define_cache.get_or_fetch(word, lambda: self.fetch_definition(word))
+        except Exception as e:
+            await ctx.send(f"⚠️ An error occurred while fetching `{word}`.")
+            logger.exception("Error in define command:")
+            return
+
+        if entry is None:
+            await ctx.send(f"❌ Sorry, I couldn't find a definition for **{word}**.")
+            return
+
+        if not entry["has_meanings"]:
+            await ctx.send(f"⚠️ No meanings found for **{word}**.")
+            return
+
+        if not entry["definitions"]:
+            await ctx.send(f"⚠️ No definitions found for **{word}**.")
+            return
+
+        embed = discord.Embed(
+            title=f"{entry['word'].capitalize()} ({entry['part_of_speech']})",
+            color=discord.Color.blue()
+        )
+
+        # IPA pronunciation
+        if entry["phonetic"]:
+            embed.description = f"Pronunciation: *{entry['phonetic']}*"
+
+        # Up to 3 definitions
+        for i, d in enumerate(entry["definitions"], start=1):
+            value = f"{d['definition']}"
+            if d["example"]:
+                value += f"\n_Example_: {d['example']}"
+            embed.add_field(name=f"Definition {i}", value=value, inline=False)
+
+        await ctx.send(embed=embed)
+
+    # --- Help command ---
+    @commands.command(name='help')
+    async def help_command(self, ctx):
+        embed = discord.Embed(
+            title="Help Menu",
+            description="Here are the available commands:",
+            color=discord.Color(0xFFFFFF)
+        )
+
+        embed.add_field(
+            name="!help",
+            value="Displays this help message.",
+            inline=False
+        )
+        embed.add_field(
+            name="!getrole [role_key]",
+            value="Assign yourself a cosmetic role. check the key for each role by using '!listroles'",
+            inline=False
+        )
+        embed.add_field(
+            name="!addrole [key] [role name] (Admin only)",
+            value="Add a new cosmetic role. Ask Lan for instructions.",
+            inline=False
+        )
+        embed.add_field(
+            name="!importroles / !exportroles (Admin only)",
+            value="Add many cosmetic roles at once from `key: Role Name` lines or a JSON file, or download them all as JSON.",
+            inline=False
+        )
+        embed.add_field(
+            name="!removeroles [keys...] / !renameroles [old new...] (Admin only)",
+            value="Remove or rename cosmetic role keys. The Discord roles themselves are kept.",
+            inline=False
+        )
+        embed.add_field(
+            name="!createroles (Admin only)",
+            value="Create the Discord role for every cosmetic role this server is missing.",
+            inline=False
+        )
+        embed.add_field(
+            name="!listroles",
+            value="List all available cosmetic roles and their keys.",
+            inline=False
+        )
+        embed.add_field(
+            name="!remove",
+            value="Clears your cosmetic roles.",
+            inline=False
+        )
+        embed.add_field(
+            name="!prompt",
+            value="Get the current weekly writing prompt.",
+            inline=False
+        )
+        embed.add_field(
+            name="!forceprompt (Admin only)",
+            value="Refreshes the weekly prompt.",
+            inline=False
+        )
+        embed.add_field(
+            name="!promptchannel [#channel] (Admin only)",
+            value="Post this server's weekly prompts in the given channel (default: this one).",
+            inline=False
+        )
+        embed.add_field(
+            name="!promptschedule [day] [HH:MM] [timezone] (Admin only)",
+            value="Show or change when this server's weekly prompt is posted.",
+            inline=False
+        )
+        embed.add_field(
+            name="!gif [search term]",
+            value="Posts a random gif from giphy based on your inputted search term.",
+            inline=False
+        )
+        embed.add_field(
+            name="!gold",
+            value="Try it out ;)",
+            inline=False
+        )
+        embed.add_field(
+            name="!poll [yes/no question] (WIP)",
+            value="posts a simple yes/no question with reacts",
+            inline=False
+        )
+        embed.add_field(
+            name="!ask",
+            value="Ask Salem a question like you would a magic 8ball and see how she responds!",
+            inline=False
+        )
+        embed.add_field(
+            name="!define [word]",
+            value="Ask Salem to give you the WordNet dictionary definiton of a word.",
+            inline=False
+        )
+        embed.add_field(
+            name="!bonk",
+            value="Outputs the number of times Les has bonked you innocent fools :(",
+            inline=False
+        )
+        embed.set_footer(text="More features coming soon!")
+
+        await ctx.send(embed=embed)
+
+
+async def setup(bot):
+    await bot.add_cog(Utility(bot))
@@ -0,0 +1,100 @@
+import os
+
+# --- Configuration ---
+# Everything the bot reads from the environment, parsed in one place when
+# the bot is created rather than at import. Channel IDs are optional: a bot
+# without PROMPT_CHANNEL_ID only posts prompts where !promptchannel was used,
+# and one without COUNTER_CHANNEL_ID runs no keep-alive counter.
+#
+# Sharding: SHARD_COUNT alone runs every shard in this process. A cluster of
+# processes sets the same SHARD_COUNT everywhere, each process's own
+# SHARD_IDS (e.g. "0,1"), and one STATE_DB they all share. The process with
+# shard 0 replicates state to GitHub unless STATE_REPLICATOR says otherwise.
+
+
+class ConfigError(ValueError):
+    pass
+
+
+def _int(environ, name):
+    value = environ.get(name)
+    if not value:
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        raise ConfigError(f"{name} must be a number, got {value!r}") from None
+
+
+def _int_list(environ, name):
+    value = environ.get(name)
+    if not value:
+        return None
+    try:
+        return sorted({int(part) for part in value.split(",")})
+    except ValueError:
+        raise ConfigError(f"{name} must be a comma-separated list of numbers, got {value!r}") from None
+
+
+def _flag(environ, name, default):
+    value = environ.get(name)
+    if not value:
+        return default
+    if value.lower() not in ("1", "true", "yes", "0", "false", "no"):
+        raise ConfigError(f"{name} must be true or false, got {value!r}")
+    return value.lower() in ("1", "true", "yes")
+
+
+class Config:
+    def __init__(self, **values):
+        self.__dict__.update(values)
+
+    @classmethod
+    def from_env(cls, environ=None):
+        env = os.environ if environ is None else environ
+        shard_count = _int(env, "SHARD_COUNT")
+        shard_ids = _int_list(env, "SHARD_IDS")
+        state_db = env.get("STATE_DB")
+        if shard_ids is not None:
+            if shard_count is None:
+                raise ConfigError("SHARD_IDS needs SHARD_COUNT")
+            if shard_ids[0] < 0 or shard_ids[-1] >= shard_count:
+                raise ConfigError(f"SHARD_IDS must be between 0 and {shard_count - 1}, got {shard_ids}")
+            if len(shard_ids) < shard_count and not state_db:
+                raise ConfigError("Running only some of the shards needs a shared STATE_DB")
+        return cls(
+            token=env.get("DISCORD_TOKEN"),
+            github_token=env.get("GITHUB_TOKEN"),
+            prompt_channel_id=_int(env, "PROMPT_CHANNEL_ID"),
+            counter_channel_id=_int(env, "COUNTER_CHANNEL_ID"),
+            github_prompts_url=env.get("GITHUB_PROMPTS_URL"),
+            current_prompt_url=env.get("CURRENT_PROMPT_URL"),
+            current_prompt_upload_url=env.get("CURRENT_PROMPT_UPLOAD_URL"),
+            cosmetic_roles_url=env.get("COSMETIC_ROLES_URL"),
+            cosmetic_roles_upload_url=env.get("COSMETIC_ROLES_UPLOAD_URL"),
+            bonk_counter_url=env.get("BONK_COUNTER_URL"),
+            bonk_counter_upload_url=env.get("BONK_COUNTER_UPLOAD_URL"),
+            prompt_bag_url=env.get("PROMPT_BAG_URL"),
+            prompt_config_url=env.get("PROMPT_CONFIG_URL"),
+            prompt_posts_url=env.get("PROMPT_POSTS_URL"),
+            keep_alive_url=env.get("KEEP_ALIVE_URL"),
+            tenor_search_url=env.get("TENOR_SEARCH_URL", "https://tenor.googleapis.com/v2/search"),
+            tenor_api_key=env.get("TENOR_API_KEY"),
+            dictionary_api_url=env.get("DICTIONARY_API_URL", "https://api.dictionaryapi.dev/api/v2/entries/en"),
+            define_cache_path=env.get("DEFINE_CACHE_PATH"),
+            state_dir=env.get("STATE_DIR", "."),
+            state_db=state_db,
+            shard_count=shard_count,
+            shard_ids=shard_ids,
+            state_replicator=_flag(env, "STATE_REPLICATOR", shard_ids is None or 0 in shard_ids),
+            port=_int(env, "PORT") or 5000,
+            # LOG_LEVELS e.g. "INFO,discord.gateway=WARNING,lanschild.messages=DEBUG"
+            log_levels=env.get("LOG_LEVELS", "INFO"),
+            log_format=env.get("LOG_FORMAT", "json"),
+            log_file=env.get("LOG_FILE", "discord.log"),
+        )
+
+    def __repr__(self):
+        hidden = {"token", "github_token", "tenor_api_key"}
+        shown = ", ".join(f"{k}={'***' if k in hidden and v else v!r}" for k, v in self.__dict__.items())
+        return f"Config({shown})"
@@ -0,0 +1,111 @@
+import asyncio
+
+from discord.ext import commands
+
+from caching import SingleFlight
+from request_scheduler import INTERACTIVE, request_priority
+from state_store import GitHubContentsBackend, LocalFileBackend, SharedStateStore, SqliteBackend, StateStore
+
+# --- State ---
+# Reads are served from local files, or from STATE_DB when shard clusters
+# share state; GitHub is replicated in the background.
+STATE_FILES = {
+    "cosmetic_roles": ("cosmetic_roles.json", "json"),
+    "bonk_counter": ("bonk_counter.json", "json"),
+    "current_prompt": ("current_prompt.txt", "text"),
+    "prompt_bag": ("prompt_bag.json", "json"),  # read for upgrades; the bag now lives in prompt_posts
+    "prompt_config": ("prompt_config.json", "json"),
+    "prompt_posts": ("prompt_posts.json", "json"),
+    "keep_alive": ("keep_alive.json", "json"),
+}
+SYNC_POLICY = {
+    # Role commands call sync(delay=COMMIT_DELAY) so a burst of edits shares
+    # one commit; the change count alone never forces a push
+    "cosmetic_roles": (60, 1000),
+    # Bonks come in bursts; batch them into one commit
+    "bonk_counter": (300, 25),
+    # Written on counter message changes, shutdown and daily; no hurry to commit
+    "keep_alive": (3600, 1000),
+}
+# When a push merges concurrent edits, these keys' numbers add up
+MERGE_COUNTERS = ("bonk_counter",)
+
+
+def build_state_store(config, http_pool, github_cache):
+    headers = {
+        "Authorization": f"token {config.github_token}",
+        "Accept": "application/vnd.github.v3+json",
+    }
+    remote_files = {
+        "cosmetic_roles": (config.cosmetic_roles_url, config.cosmetic_roles_upload_url, "json"),
+        "bonk_counter": (config.bonk_counter_url, config.bonk_counter_upload_url, "json"),
+        "current_prompt": (config.current_prompt_upload_url, config.current_prompt_upload_url, "text"),
+    }
+    for key, url in {
+        "prompt_bag": config.prompt_bag_url, "prompt_config": config.prompt_config_url,
+        "prompt_posts": config.prompt_posts_url, "keep_alive": config.keep_alive_url,
+    }.items():
+        if url:
+            remote_files[key] = (url, url, "json")
+    local = LocalFileBackend(config.state_dir, STATE_FILES)
+    remote = GitHubContentsBackend(http_pool, github_cache, headers, remote_files)
+    if not config.state_db:
+        return StateStore(local, remote, sync_policy=SYNC_POLICY, counters=MERGE_COUNTERS)
+    shared = SqliteBackend(config.state_db, STATE_FILES)
+    shared.seed(local)  # first run on a new database starts from the local files
+    return SharedStateStore(
+        shared, remote, sync_policy=SYNC_POLICY, counters=MERGE_COUNTERS, replicator=config.state_replicator,
+    )
+
+
+# --- Lazy State Loaders ---
+# Commands declare the state they read with @needs_state(...). Each key is
+# pulled once per process: the startup load pulls them all, and a command
+# that arrives first joins (or starts) that same in-flight pull instead of
+# firing its own. Once a key is loaded the check is a set lookup, and
+# commands that declare nothing never wait on state at all.
+class StateLoader:
+    def __init__(self, store):
+        self.store = store
+        self.loaded = set()
+        self._flights = SingleFlight()
+        self._appliers = {}   # key -> [callback], refresh in-memory copies after a pull
+        store.on_merge = self.apply   # and after a push merged in remote edits
+
+    def on_load(self, key, callback):
+        self._appliers.setdefault(key, []).append(callback)
+
+    def remove_listener(self, key, callback):
+        callbacks = self._appliers.get(key, [])
+        if callback in callbacks:
+            callbacks.remove(callback)
+
+    def apply(self, key):
+        for callback in self._appliers.get(key, ()):
+            callback()
+
+    async def load(self, key):
+        """Pull key from GitHub once per process; concurrent callers share the pull."""
+        async def pull():
+            await self.store.pull(key)  # falls back to the local copy on errors
+            self.apply(key)
+            self.loaded.add(key)
+
+        if key not in self.loaded:
+            await self._flights.do(key, pull)
+
+    async def load_all(self, keys):
+        await asyncio.gather(*(self.load(key) for key in keys if key not in self.loaded))
+
+
+def needs_state(*keys):
+    """Command decorator: load keys (once) before the command runs."""
+    async def load(*args):
+        ctx = args[-1]   # cog commands get (cog, ctx)
+        # Set before the load spawns: SingleFlight's task copies this context
+        request_priority.set(INTERACTIVE)
+        await ctx.bot.state.load_all(keys)
+    return commands.before_invoke(load)
+
+
+PROMPT_STATE = ("prompt_config", "prompt_posts", "current_prompt")
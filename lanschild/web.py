@@ -0,0 +1,51 @@
+import logging
+import time
+
+from aiohttp import web
+
+logger = logging.getLogger(__name__)
+
+# --- Web Server ---
+# Keep-alive pings, health checks and metrics, served on the bot's own event
+# loop. Started from setup_hook; readiness needs the gateway and state.
+BOT = web.AppKey("bot")
+
+
+async def home(request):
+    logger.debug("✅ Ping received to keep alive.")
+    return web.Response(text="I am still alive, father!")
+
+
+async def healthz(request):
+    bot = request.app[BOT]
+    return web.json_response({
+        "alive": not bot.is_closed(),
+        "uptime_seconds": int(time.perf_counter() - bot.process_start),
+        "total_uptime_seconds": int(bot.total_uptime_seconds()),
+        "shards": sorted(bot.shards),
+        "shard_count": bot.shard_count,
+    })
+
+
+async def readyz(request):
+    bot = request.app[BOT]
+    checks = {"gateway": bot.is_ready() and not bot.is_closed(), "state": bot.state_ready}
+    return web.json_response({"ready": all(checks.values()), **checks}, status=200 if all(checks.values()) else 503)
+
+
+async def metrics_endpoint(request):
+    bot = request.app[BOT]
+    return web.Response(body=bot.metrics.render().encode(), headers={"Content-Type": "text/plain; version=0.0.4; charset=utf-8"})
+
+
+async def start_web_server(bot, port):
+    app = web.Application()
+    app[BOT] = bot
+    app.router.add_get("/", home)
+    app.router.add_get("/healthz", healthz)
+    app.router.add_get("/readyz", readyz)
+    app.router.add_get("/metrics", metrics_endpoint)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, "0.0.0.0", port).start()
+    return runner
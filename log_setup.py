@@ -0,0 +1,124 @@
+import copy
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+import time
+
+# --- Logging Pipeline ---
+# Every logger writes into an in-memory queue through one QueueHandler; a
+# QueueListener thread formats the records and does the actual console/file
+# I/O, so logging from the event loop never blocks on a write.
+#
+# Levels are set per subsystem from a spec such as
+#     "INFO,discord=WARNING,discord.gateway=ERROR,lanschild.messages=DEBUG"
+# (a bare level is the root level). Hot paths log through a logger with a
+# DebugSampler attached, which lets a few DEBUG records per message template
+# through each interval and counts the rest.
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: ts, level, logger, msg, plus exc and extras."""
+
+    RESERVED = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+    def format(self, record):
+        entry = {
+            "ts": self.formatTime(record, "%Y-%m-%dT%H:%M:%S") + f".{int(record.msecs):03d}",
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in self.RESERVED and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class DebugSampler(logging.Filter):
+    """Rate-limits DEBUG records: at most ``burst`` per message template per ``interval`` seconds.
+
+    The first record let through after a quiet spell carries a
+    ``suppressed`` count of what was dropped. INFO and above always pass.
+    """
+
+    def __init__(self, interval=10.0, burst=5):
+        super().__init__()
+        self.interval = interval
+        self.burst = burst
+        self._windows = {}   # (logger, template) -> [window start, emitted, suppressed]
+
+    def filter(self, record):
+        if record.levelno > logging.DEBUG:
+            return True
+        key = (record.name, record.msg)
+        now = time.monotonic()
+        window = self._windows.get(key)
+        if window is None or now - window[0] >= self.interval:
+            suppressed = window[2] if window else 0
+            window = self._windows[key] = [now, 0, 0]
+            if suppressed:
+                record.suppressed = suppressed
+        if window[1] >= self.burst:
+            window[2] += 1
+            return False
+        window[1] += 1
+        return True
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    def prepare(self, record):
+        # Resolve args and tracebacks on this side (they may not survive the
+        # trip), but leave formatting to the listener's handlers.
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def parse_levels(spec, default="INFO"):
+    """Parse "LEVEL,name=LEVEL,..." into (root level, {logger name: level})."""
+    root, levels = default, {}
+    for part in (spec or "").split(","):
+        part = part.strip()
+        if not part:
+            continue
+        name, sep, level = part.rpartition("=")
+        if sep:
+            levels[name.strip()] = level.strip().upper()
+        else:
+            root = level.upper()
+    return root, levels
+
+
+def setup_logging(levels=None, fmt="json", log_file=None):
+    """Install the queue pipeline on the root logger and return the started QueueListener."""
+    formatter = JsonFormatter() if fmt == "json" else logging.Formatter("%(asctime)s [%(levelname)s] %(name)s: %(message)s")
+    outputs = [logging.StreamHandler(sys.stdout)]
+    if log_file:
+        outputs.append(logging.FileHandler(log_file, encoding="utf-8", mode="w"))
+    for output in outputs:
+        output.setFormatter(formatter)
+
+    records = queue.SimpleQueue()
+    root = logging.getLogger()
+    for existing in root.handlers[:]:
+        root.removeHandler(existing)
+    root.addHandler(_QueueHandler(records))
+
+    root_level, named = parse_levels(levels)
+    root.setLevel(root_level)
+    for name, level in named.items():
+        logging.getLogger(name).setLevel(level)
+
+    listener = logging.handlers.QueueListener(records, *outputs, respect_handler_level=True)
+    listener.start()
+    return listener
@@ -0,0 +1,41 @@
+# --- Three-Way Merge ---
+# Combines our edits and theirs, both made from the same base version. For
+# each field, a side that left the field unchanged gets the other side's
+# value. Dicts changed on both sides are merged key by key. Any other value
+# both sides changed is a conflict, and ours wins, except numbers in a
+# counter merge, where both sides' increments are kept.
+
+DELETED = object()
+
+
+def merge3(base, ours, theirs, counters=False):
+    """Return (merged, conflicts). ``conflicts`` lists the paths where ours overrode theirs."""
+    conflicts = []
+    merged = _merge(base, ours, theirs, counters, (), conflicts)
+    return merged, conflicts
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _merge(base, ours, theirs, counters, path, conflicts):
+    if ours == theirs or theirs == base:
+        return ours
+    if ours == base:
+        return theirs
+    if isinstance(ours, dict) and isinstance(theirs, dict):
+        base = base if isinstance(base, dict) else {}
+        merged = {}
+        for key in {**theirs, **ours}:
+            value = _merge(
+                base.get(key, DELETED), ours.get(key, DELETED), theirs.get(key, DELETED),
+                counters, path + (key,), conflicts,
+            )
+            if value is not DELETED:
+                merged[key] = value
+        return merged
+    if counters and _is_number(base) and _is_number(ours) and _is_number(theirs):
+        return theirs + ours - base
+    conflicts.append(".".join(str(part) for part in path) or "(value)")
+    return ours
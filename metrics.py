@@ -0,0 +1,147 @@
+import asyncio
+import bisect
+import math
+import time
+from contextlib import contextmanager
+
+# --- Metrics ---
+# Just enough of the Prometheus data model for one process: labelled
+# histograms and counters that are cheap to update from the event loop, and
+# callback metrics that read existing stats dicts when /metrics is scraped.
+# render() produces the text exposition format (version 0.0.4).
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _format_value(value):
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return "NaN"
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    pairs = (
+        f'{key}="' + str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") + '"'
+        for key, value in labels
+    )
+    return "{" + ",".join(pairs) + "}"
+
+
+class Histogram:
+    def __init__(self, name, help, labels=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}   # label values -> [bucket counts..., sum, count]
+
+    def observe(self, value, **labels):
+        key = tuple(str(labels.get(name, "")) for name in self.labels)
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = [0] * len(self.buckets) + [0.0, 0]
+        index = bisect.bisect_left(self.buckets, value)
+        if index < len(self.buckets):
+            series[index] += 1
+        series[-2] += value
+        series[-1] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def render(self):
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} histogram"
+        for key, series in list(self._series.items()):
+            base = list(zip(self.labels, key))
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                yield f"{self.name}_bucket{_format_labels(base + [('le', _format_value(float(bound)))])} {cumulative}"
+            yield f"{self.name}_bucket{_format_labels(base + [('le', '+Inf')])} {series[-1]}"
+            yield f"{self.name}_sum{_format_labels(base)} {_format_value(series[-2])}"
+            yield f"{self.name}_count{_format_labels(base)} {series[-1]}"
+
+
+class Counter:
+    def __init__(self, name, help, labels=()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._values = {}
+
+    def inc(self, amount=1, **labels):
+        key = tuple(str(labels.get(name, "")) for name in self.labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self):
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} counter"
+        for key, value in list(self._values.items()):
+            yield f"{self.name}{_format_labels(list(zip(self.labels, key)))} {_format_value(value)}"
+
+
+class CallbackMetric:
+    """A gauge or counter read at scrape time: ``collect()`` yields (labels dict, value)."""
+
+    def __init__(self, name, help, kind, collect):
+        self.name = name
+        self.help = help
+        self.kind = kind
+        self.collect = collect
+
+    def render(self):
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} {self.kind}"
+        for labels, value in self.collect():
+            yield f"{self.name}{_format_labels(sorted(labels.items()))} {_format_value(value)}"
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name, help, labels=(), buckets=DEFAULT_BUCKETS):
+        return self.register(Histogram(name, help, labels, buckets))
+
+    def counter(self, name, help, labels=()):
+        return self.register(Counter(name, help, labels))
+
+    def callback(self, name, help, kind, collect):
+        return self.register(CallbackMetric(name, help, kind, collect))
+
+    def render(self):
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+class LoopLagMonitor:
+    """Measures how late the event loop wakes a task that sleeps ``interval`` seconds."""
+
+    def __init__(self, histogram, interval=1.0):
+        self.histogram = histogram
+        self.interval = interval
+        self.last = 0.0
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(self.interval)
+            self.last = max(0.0, loop.time() - start - self.interval)
+            self.histogram.observe(self.last)
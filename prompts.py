@@ -0,0 +1,176 @@
+import array
+import bisect
+import hashlib
+import random
+
+# --- Prompt Corpus ---
+# prompts.txt is parsed once per download into a PromptCorpus. All prompts
+# share one string plus an array of offsets, so even tens of thousands of
+# them take little memory, and indexing a prompt is just a slice.
+#
+# Prompts are drawn through a ShuffleBag, so every prompt comes up once
+# before any repeats. Each cycle has a seed, and each prompt a rank: a 64-bit
+# hash of the seed and its text. Prompts are drawn in rank order, and the
+# persisted state is just (seed, cursor), the cursor being the rank of the
+# last prompt drawn. The draw order is built once per process (or per corpus
+# change) and kept by the bag; each draw after that is O(1).
+#
+# Because ranks depend on the text and not on line positions, editing
+# prompts.txt keeps the cycle going: removed prompts simply drop out, and
+# prompts after the cursor are still to come. A prompt added mid-cycle whose
+# rank falls behind the cursor is moved to a random rank ahead of it; only
+# those moves are persisted next to the seed and cursor.
+
+
+class PromptCorpus:
+    __slots__ = ("_text", "_offsets", "digest")
+
+    def __init__(self, prompts):
+        offsets = array.array("I", [0])
+        parts = []
+        end = 0
+        for prompt in prompts:
+            parts.append(prompt)
+            end += len(prompt)
+            offsets.append(end)
+        self._text = "".join(parts)
+        self._offsets = offsets
+        self.digest = hashlib.sha1("\n".join(parts).encode()).hexdigest()[:16]
+
+    @classmethod
+    def from_text(cls, text):
+        return cls(line for line in (l.strip() for l in text.splitlines()) if line)
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index):
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        return self._text[self._offsets[index]:self._offsets[index + 1]]
+
+
+RANK_SPACE = 1 << 64
+
+
+def prompt_id(prompt):
+    return hashlib.sha1(prompt.encode()).hexdigest()[:12]
+
+
+class ShuffleBag:
+    def __init__(self, state=None):
+        self._ids = None        # prompt_id of each index of the last corpus seen
+        self._ids_digest = None
+        self._ranks = None      # the cycle's draw order: sorted ranks...
+        self._indices = None    # ...and the corpus index at each rank
+        self._order_key = None
+        self._next = 0          # position in the draw order of the first rank past the cursor
+        self._peeked = None
+        self.restore(state)
+
+    def state(self):
+        state = {"seed": self.seed, "cursor": self.cursor}
+        if self.moved:
+            state["moved"] = dict(self.moved)
+        return state
+
+    def restore(self, state):
+        """Adopt a saved state in place; the draw order is kept if the cycle is the same."""
+        state = state or {}
+        self._legacy = None
+        if "used" in state or "corpus" in state:
+            # Saved by an older version; converted on the next peek
+            self._legacy = state
+            state = {}
+        self.seed = state.get("seed")
+        self.cursor = state.get("cursor", -1)
+        self.moved = dict(state.get("moved", {}))
+        self._moved_key = tuple(sorted(self.moved.items()))
+        self._peeked = None
+
+    def _set_moved(self, moved):
+        self.moved = moved
+        self._moved_key = tuple(sorted(moved.items()))
+
+    def _new_cycle(self):
+        self.seed = random.getrandbits(48)
+        self.cursor = -1
+        self._set_moved({})
+
+    def _natural_rank(self, pid):
+        return int.from_bytes(hashlib.sha1(f"{self.seed}:{pid}".encode()).digest()[:8], "big")
+
+    def _upgrade(self, corpus):
+        legacy, self._legacy = self._legacy, None
+        if "used" in legacy:
+            used = set(legacy["used"])
+        elif legacy.get("seed") is not None and legacy.get("corpus") == corpus.digest:
+            order = list(range(len(corpus)))
+            random.Random(legacy["seed"]).shuffle(order)
+            used = {prompt_id(corpus[i]) for i in order[:legacy.get("cursor", 0)]}
+        else:
+            return  # the old format started a new cycle on any corpus change anyway
+        # Start a cycle with the prompts already used parked behind the cursor
+        self._new_cycle()
+        self._set_moved({pid: -1 for pid in used})
+
+    def _reconcile(self, corpus):
+        """Adopt a new corpus, keeping the cycle: new prompts go somewhere ahead of the cursor."""
+        ids = [prompt_id(corpus[i]) for i in range(len(corpus))]
+        present = set(ids)
+        moved = {pid: rank for pid, rank in self.moved.items() if pid in present}
+        if self._ids is not None and self.seed is not None:
+            for pid in present.difference(self._ids):
+                if pid not in moved and self._natural_rank(pid) <= self.cursor:
+                    moved[pid] = random.randrange(self.cursor + 1, RANK_SPACE)
+        self._ids = ids
+        self._ids_digest = corpus.digest
+        if moved != self.moved:
+            self._set_moved(moved)
+
+    def _ordering(self, corpus):
+        if self._ids_digest != corpus.digest:
+            self._reconcile(corpus)
+        key = (self.seed, corpus.digest, self._moved_key)
+        if self._order_key != key:
+            ranks = [self.moved.get(pid) for pid in self._ids]
+            ranks = [self._natural_rank(pid) if rank is None else rank for pid, rank in zip(self._ids, ranks)]
+            order = sorted(range(len(ranks)), key=ranks.__getitem__)
+            self._ranks = [ranks[i] for i in order]
+            self._indices = array.array("I", order)
+            self._order_key = key
+            self._next = 0
+
+    def _next_unused(self, corpus):
+        self._ordering(corpus)
+        ranks = self._ranks
+        if self._next and ranks[self._next - 1] > self.cursor:
+            # The cursor moved back (an older state was restored)
+            self._next = bisect.bisect_right(ranks, self.cursor)
+        while self._next < len(ranks) and ranks[self._next] <= self.cursor:
+            self._next += 1
+        return self._next if self._next < len(ranks) else None
+
+    def peek(self, corpus):
+        """Return the next prompt without using it up (None for an empty corpus).
+
+        Starts a new cycle first if every prompt in the corpus was used.
+        """
+        if not len(corpus):
+            return None
+        if self._legacy is not None:
+            self._upgrade(corpus)
+        if self.seed is None:
+            self._new_cycle()
+        pos = self._next_unused(corpus)
+        if pos is None:
+            self._new_cycle()
+            pos = self._next_unused(corpus)
+        self._peeked = self._ranks[pos]
+        return corpus[self._indices[pos]]
+
+    def advance(self):
+        """Mark the prompt returned by peek() as used."""
+        if self._peeked is not None:
+            self.cursor = max(self.cursor, self._peeked)
+        self._peeked = None
@@ -0,0 +1,235 @@
+import asyncio
+import contextvars
+import heapq
+import itertools
+import logging
+import random
+import time
+from email.utils import parsedate_to_datetime
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+# --- Outbound Request Scheduler ---
+# Every outbound call to GitHub, Tenor or dictionaryapi goes through one
+# scheduler. It gives each host a token bucket and serves waiting calls by
+# priority: commands a user is waiting on go before background refreshes.
+#
+# When a host says slow down (429, or 403 with Retry-After /
+# X-RateLimit-Remaining: 0), the scheduler pauses that host's bucket until
+# Retry-After / X-RateLimit-Reset. Transient failures (5xx, connection
+# errors, timeouts) are retried with jittered exponential backoff. A caller
+# that would have to wait longer than its priority allows gets the
+# rate-limit response back (or RateLimited) instead of hanging.
+
+INTERACTIVE = 0
+BACKGROUND = 1
+
+# Set to INTERACTIVE while a command runs; tasks spawned from it inherit it
+request_priority = contextvars.ContextVar("request_priority", default=BACKGROUND)
+
+HOST_LIMITS = {
+    # 5000 requests/hour with a token; keep well under it
+    "github": {"rate": 1.0, "burst": 10},
+    "tenor": {"rate": 5.0, "burst": 10},
+    "dictionary": {"rate": 5.0, "burst": 10},
+}
+RETRY_STATUSES = {500, 502, 503, 504}
+
+
+class RateLimited(aiohttp.ClientError):
+    """The host is paused for longer than the caller is willing to wait."""
+
+    def __init__(self, family, wait):
+        super().__init__(f"{family} is rate limited for another {wait:.0f}s")
+        self.family = family
+        self.wait = wait
+
+
+class TokenBucket:
+    """Token bucket whose waiters are served by priority, then in arrival order."""
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.capacity = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self._waiters = []   # heap of (priority, seq, future)
+        self._seq = itertools.count()
+        self._timer = None
+
+    def pause(self, seconds):
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+    def paused_for(self):
+        return max(0.0, self.paused_until - time.monotonic())
+
+    async def acquire(self, priority):
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._seq), future))
+        self._dispatch()
+        await future
+
+    def _dispatch(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        delay = None
+        while self._waiters:
+            future = self._waiters[0][2]
+            if future.done():   # cancelled while waiting
+                heapq.heappop(self._waiters)
+                continue
+            if now < self.paused_until:
+                delay = self.paused_until - now
+                break
+            if self.tokens < 1:
+                delay = (1 - self.tokens) / self.rate
+                break
+            self.tokens -= 1
+            heapq.heappop(self._waiters)
+            future.set_result(None)
+
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if delay is not None:
+            self._timer = asyncio.get_running_loop().call_later(delay, self._dispatch)
+
+
+class RequestScheduler:
+    def __init__(self, limits=None, max_attempts=4, base_delay=0.5, max_delay=30.0, max_wait=None):
+        limits = limits or HOST_LIMITS
+        self.buckets = {family: TokenBucket(**options) for family, options in limits.items()}
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        # Longest rate-limit pause each priority will sit through
+        self.max_wait = max_wait or {INTERACTIVE: 10.0, BACKGROUND: 600.0}
+        self.stats = {family: {"requests": 0, "retries": 0, "throttled": 0} for family in limits}
+
+    def backoff(self, attempt):
+        """Full-jitter exponential backoff for the given retry number."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    @staticmethod
+    def rate_limit_wait(resp):
+        """Seconds the host asked us to wait, or None if resp is not a rate limit."""
+        headers = resp.headers
+        retry_after = headers.get("Retry-After")
+        exhausted = headers.get("X-RateLimit-Remaining") == "0"
+        if resp.status != 429 and not (resp.status == 403 and (retry_after or exhausted)):
+            return None
+        if retry_after:
+            try:
+                return max(0.0, float(retry_after))
+            except ValueError:
+                try:
+                    return max(0.0, parsedate_to_datetime(retry_after).timestamp() - time.time())
+                except (TypeError, ValueError):
+                    pass
+        reset = headers.get("X-RateLimit-Reset")
+        if exhausted and reset:
+            try:
+                return max(0.0, float(reset) - time.time())
+            except ValueError:
+                pass
+        return 60.0  # GitHub's advice for secondary limits without a hint
+
+    def _note_quota(self, family, resp):
+        # Last request of the window: pause before the host has to refuse us
+        headers = resp.headers
+        if headers.get("X-RateLimit-Remaining") == "0" and headers.get("X-RateLimit-Reset"):
+            try:
+                self.buckets[family].pause(float(headers["X-RateLimit-Reset"]) - time.time())
+            except ValueError:
+                pass
+
+    async def request(self, session, family, method, url, **kwargs):
+        """Send one request on session with rate limiting and retries; returns the ClientResponse."""
+        priority = request_priority.get()
+        max_wait = self.max_wait[priority]
+        bucket = self.buckets.get(family)
+        stats = self.stats.setdefault(family, {"requests": 0, "retries": 0, "throttled": 0})
+        attempt = 0
+        while True:
+            if bucket is not None:
+                if bucket.paused_for() > max_wait:
+                    raise RateLimited(family, bucket.paused_for())
+                await bucket.acquire(priority)
+            stats["requests"] += 1
+            last_attempt = attempt + 1 >= self.max_attempts
+            try:
+                resp = await session.request(method, url, **kwargs)
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                if last_attempt:
+                    raise
+                delay = self.backoff(attempt)
+                logger.warning(f"{method} {url} failed ({e!r}), retrying in {delay:.1f}s")
+            else:
+                if bucket is not None:
+                    self._note_quota(family, resp)
+                wait = self.rate_limit_wait(resp)
+                if wait is not None:
+                    stats["throttled"] += 1
+                    if bucket is not None:
+                        bucket.pause(wait + random.uniform(0, 1))
+                    if last_attempt or wait > max_wait:
+                        return resp
+                    delay = 0 if bucket is not None else wait   # a paused bucket holds the retry back
+                    logger.warning(f"{family} rate limited ({resp.status}), pausing {wait:.0f}s")
+                elif resp.status in RETRY_STATUSES and not last_attempt:
+                    delay = self.backoff(attempt)
+                    logger.warning(f"{method} {url} returned {resp.status}, retrying in {delay:.1f}s")
+                else:
+                    return resp
+                resp.release()
+            stats["retries"] += 1
+            attempt += 1
+            if delay:
+                await asyncio.sleep(delay)
+
+
+class _ScheduledRequest:
+    """Lets ``session.get(...)`` be awaited or used as ``async with``, like aiohttp's."""
+
+    def __init__(self, coro):
+        self._coro = coro
+        self._resp = None
+
+    def __await__(self):
+        return self._coro.__await__()
+
+    async def __aenter__(self):
+        self._resp = await self._coro
+        return self._resp
+
+    async def __aexit__(self, *exc_info):
+        self._resp.release()
+
+
+class ScheduledSession:
+    """The slice of aiohttp.ClientSession the bot uses, routed through a RequestScheduler."""
+
+    def __init__(self, session, family, scheduler):
+        self._session = session
+        self.family = family
+        self.scheduler = scheduler
+
+    @property
+    def closed(self):
+        return self._session.closed
+
+    def request(self, method, url, **kwargs):
+        return _ScheduledRequest(self.scheduler.request(self._session, self.family, method, url, **kwargs))
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def put(self, url, **kwargs):
+        return self.request("PUT", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
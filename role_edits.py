@@ -0,0 +1,90 @@
+import asyncio
+import logging
+
+import discord
+
+logger = logging.getLogger(__name__)
+
+# --- Coalesced Member Role Edits ---
+# Role changes are expressed as transforms over a member's set of role IDs
+# and applied with a single member.edit(roles=...) call. Changes for the same
+# member are serialized: the first one is applied right away, and requests
+# that arrive while an edit is in flight are folded into the next one. Each
+# transform runs, in order, on the result of the previous one, and only the
+# final set goes to Discord.
+
+
+class RoleEditQueue:
+    def __init__(self):
+        self._batches = {}   # (guild_id, member_id) -> [(transform, reason, future)] waiting for the next edit
+        # One worker per member with edits queued; holding the task keeps it from being garbage-collected
+        self._workers = {}   # (guild_id, member_id) -> asyncio.Task
+        # Last edit per member, to bridge the gap before the gateway update
+        # arrives; dropped when the member's worker finishes
+        self._applied = {}   # (guild_id, member_id) -> (ids the cache showed, ids we set)
+        self.stats = {"requests": 0, "edits": 0}
+
+    async def submit(self, member, transform, reason=None):
+        """Queue ``transform(role_ids) -> (new_role_ids, outcome)`` for member.
+
+        Resolves to ``outcome`` once the edit carrying this change has been
+        applied, or raises the Discord error if it failed.
+        """
+        key = (member.guild.id, member.id)
+        future = asyncio.get_running_loop().create_future()
+        self._batches.setdefault(key, []).append((transform, reason, future))
+        self.stats["requests"] += 1
+        if key not in self._workers:
+            self._workers[key] = asyncio.create_task(self._run(key, member))
+        return await future
+
+    def _current_ids(self, key, member):
+        member = member.guild.get_member(member.id) or member
+        cached = frozenset(role.id for role in member.roles if not role.is_default())
+        ids = cached
+        applied = self._applied.get(key)
+        if applied is not None:
+            if cached == applied[0]:
+                # Our last edit went through but the cache has not caught up yet
+                ids = applied[1]
+            else:
+                del self._applied[key]
+        return member, cached, ids
+
+    async def _run(self, key, member):
+        try:
+            # Whatever queued up during an edit goes out as the next one
+            while self._batches.get(key):
+                await self._apply(key, member, self._batches.pop(key))
+        finally:
+            del self._workers[key]
+            self._applied.pop(key, None)
+
+    async def _apply(self, key, member, batch):
+        try:
+            member, cached, before = self._current_ids(key, member)
+            ids = before
+            outcomes = []
+            for transform, _, _ in batch:
+                ids, outcome = transform(set(ids))
+                outcomes.append(outcome)
+            ids = frozenset(ids)
+
+            if ids != before:
+                # The edit replaces the whole list: keep roles missing from the cache by ID
+                roles = [member.guild.get_role(i) or discord.Object(id=i) for i in ids]
+                # Every caller whose change is in this edit, each reason once
+                reason = "; ".join(dict.fromkeys(reason for _, reason, _ in batch if reason))[:512] or None
+                await member.edit(roles=roles, reason=reason)
+                self._applied[key] = (cached, ids)
+                self.stats["edits"] += 1
+                if len(batch) > 1:
+                    logger.info(f"Coalesced {len(batch)} role changes for {member} into one edit")
+        except Exception as e:
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+        else:
+            for (_, _, future), outcome in zip(batch, outcomes):
+                if not future.done():
+                    future.set_result(outcome)
@@ -0,0 +1,83 @@
+# --- Cosmetic Role Index ---
+# Per-guild map of role name -> role ID, built once per guild and kept
+# current from role create/update/delete events, so commands resolve a
+# cosmetic role in O(1) instead of scanning guild.roles for every entry.
+# The reverse map (role ID -> cosmetic key) gives the role commands the set of
+# cosmetic role IDs, so swapping a member's cosmetic roles is set arithmetic
+# on their role IDs.
+#
+# Name lookups match discord.utils.get(guild.roles, name=...): when several
+# roles share a name, the first one in guild.roles order wins.
+
+
+class CosmeticRoleIndex:
+    def __init__(self):
+        self._names = {}      # guild_id -> {role name: role id}
+        self._reverse = {}    # guild_id -> {role id: cosmetic key}
+        self._config = {}     # cosmetic key -> role name the reverse maps were built for
+
+    # --- guild role map ---
+    def build(self, guild):
+        names = {}
+        for role in guild.roles:
+            names.setdefault(role.name, role.id)
+        self._names[guild.id] = names
+        self._reverse.pop(guild.id, None)
+        return names
+
+    def _guild_names(self, guild):
+        names = self._names.get(guild.id)
+        if names is None:
+            names = self.build(guild)
+        return names
+
+    def forget(self, guild):
+        self._names.pop(guild.id, None)
+        self._reverse.pop(guild.id, None)
+
+    def role_created(self, role):
+        names = self._names.get(role.guild.id)
+        if names is None:
+            return
+        if role.name in names:
+            # Position decides which duplicate wins; let the next lookup rebuild
+            self.forget(role.guild)
+            return
+        names[role.name] = role.id
+        self._reverse.pop(role.guild.id, None)
+
+    def role_deleted(self, role):
+        names = self._names.get(role.guild.id)
+        if names is None:
+            return
+        if names.get(role.name) == role.id:
+            # Another role with the same name may take its place
+            self.forget(role.guild)
+
+    def role_updated(self, before, after):
+        if before.name != after.name or before.position != after.position:
+            self.forget(after.guild)
+
+    def role_id(self, guild, name):
+        return self._guild_names(guild).get(name)
+
+    def get_role(self, guild, name):
+        role_id = self.role_id(guild, name)
+        return guild.get_role(role_id) if role_id is not None else None
+
+    # --- cosmetic key map ---
+    def cosmetic_ids(self, guild, config):
+        """Return {role id: cosmetic key} for the roles in config that exist in guild."""
+        if config != self._config:
+            self._config = dict(config)
+            self._reverse.clear()
+        reverse = self._reverse.get(guild.id)
+        if reverse is None:
+            names = self._guild_names(guild)
+            reverse = {}
+            for key, role_name in self._config.items():
+                role_id = names.get(role_name)
+                if role_id is not None:
+                    reverse.setdefault(role_id, key)
+            self._reverse[guild.id] = reverse
+        return reverse
@@ -0,0 +1,694 @@
+import asyncio
+import base64
+import contextlib
+import copy
+import json
+import logging
+import os
+import sqlite3
+import tempfile
+
+import aiohttp
+
+from merge import merge3
+from write_behind import WriteBehind
+
+logger = logging.getLogger(__name__)
+
+# --- State Store ---
+# Bot state (cosmetic roles, bonk counter, current prompt) is read and written
+# locally, in-process. Each key is one file written by atomic rename, so a
+# crash never leaves a half-written file. A remote backend (GitHub) is a
+# replica: writes are pushed to it asynchronously by one WriteBehind per key,
+# and keys with unpushed writes are recorded in a sidecar file so they are
+# still pushed after a restart. Keys the remote has no file for stay local.
+#
+# When the bot runs as several processes (shard clusters), SharedStateStore
+# keeps every key in one SQLite database instead. Each write bumps the key's
+# version; every process polls the versions and reloads what the others
+# changed, and one process (the replicator) pushes to and pulls from the
+# remote for all of them. sync() in another process leaves a request in the
+# database for the replicator and waits until the key's pushed version
+# catches up with its own write.
+#
+# Pushes are optimistic: each key remembers the remote value and blob SHA it
+# last synced with (its base). A push sends the SHA it read. If the remote
+# moved past our base, or moves during the PUT (409), the push re-reads the
+# file and three-way merges our value with theirs before trying again.
+PUSH_ATTEMPTS = 3
+SYNC_POLL_SECONDS = 0.25
+SYNC_TIMEOUT = 30  # seconds a non-replicator waits for the replicator's push
+
+MISSING = object()
+
+
+class RemoteError(Exception):
+    """The remote backend could not be reached or returned an error."""
+
+
+class WriteConflict(Exception):
+    """The remote file changed since the SHA the write was based on."""
+
+
+def encode_value(codec, value):
+    return json.dumps(value, indent=2) if codec == "json" else value
+
+
+def decode_value(codec, text):
+    return json.loads(text) if codec == "json" else text
+
+
+class LocalFileBackend:
+    """One file per key in ``root``; ``files`` maps key -> (filename, codec)."""
+
+    PENDING_FILE = ".state_pending.json"
+    BASES_FILE = ".state_bases.json"   # remote value + SHA each key last synced with
+
+    def __init__(self, root, files):
+        self.root = root
+        self.files = files
+
+    def _path(self, name):
+        return os.path.join(self.root, name)
+
+    def _write_atomic(self, name, text):
+        fd, tmp = tempfile.mkstemp(dir=self.root or ".", prefix=f".{name}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(text)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self._path(name))
+        except BaseException:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            raise
+
+    def read(self, key):
+        name, codec = self.files[key]
+        try:
+            with open(self._path(name), "r", encoding="utf-8") as f:
+                return decode_value(codec, f.read())
+        except FileNotFoundError:
+            return MISSING
+
+    def write(self, key, value):
+        name, codec = self.files[key]
+        self._write_atomic(name, encode_value(codec, value))
+
+    def read_pending(self):
+        try:
+            with open(self._path(self.PENDING_FILE), "r", encoding="utf-8") as f:
+                return set(json.load(f))
+        except (FileNotFoundError, ValueError):
+            return set()
+
+    def write_pending(self, keys):
+        self._write_atomic(self.PENDING_FILE, json.dumps(sorted(keys)))
+
+    def read_bases(self):
+        try:
+            with open(self._path(self.BASES_FILE), "r", encoding="utf-8") as f:
+                return {key: (value, sha) for key, (value, sha) in json.load(f).items()}
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def write_bases(self, bases):
+        self._write_atomic(self.BASES_FILE, json.dumps({key: list(base) for key, base in bases.items()}))
+
+
+class SqliteBackend:
+    """Every key in one SQLite database, shared by the processes of a sharded bot.
+
+    Values are stored as JSON. A key is pending while its ``version`` is
+    newer than ``pushed``, the last version replicated to the remote.
+    """
+
+    def __init__(self, path, files):
+        self.files = files
+        # Autocommit; multi-statement changes use transaction()
+        self.db = sqlite3.connect(path, timeout=5, isolation_level=None)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS state ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+            "version INTEGER NOT NULL, pushed INTEGER NOT NULL DEFAULT 0)"
+        )
+        self.db.execute("CREATE TABLE IF NOT EXISTS bases (key TEXT PRIMARY KEY, value TEXT NOT NULL, sha TEXT NOT NULL)")
+        # Keys other processes want pushed now, with the delay they asked for
+        self.db.execute("CREATE TABLE IF NOT EXISTS sync_requests (key TEXT PRIMARY KEY, delay REAL NOT NULL)")
+
+    @contextlib.contextmanager
+    def transaction(self):
+        self.db.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            self.db.execute("ROLLBACK")
+            raise
+        self.db.execute("COMMIT")
+
+    def read_versioned(self, key):
+        row = self.db.execute("SELECT value, version FROM state WHERE key = ?", (key,)).fetchone()
+        return (MISSING, 0) if row is None else (json.loads(row[0]), row[1])
+
+    def read(self, key):
+        return self.read_versioned(key)[0]
+
+    def versions(self):
+        return dict(self.db.execute("SELECT key, version FROM state"))
+
+    def _store(self, key, value, version, pushed):
+        self.db.execute(
+            "INSERT INTO state (key, value, version) VALUES (?, ?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET value = excluded.value, version = excluded.version",
+            (key, json.dumps(value), version),
+        )
+        if pushed:
+            self.mark_pushed(key, version)
+        return version
+
+    def write(self, key, value, pushed=False, expected_version=None):
+        """Store value and return its new version.
+
+        Returns None instead if expected_version is given and the key has
+        moved past it. ``pushed`` marks the value as already on the remote.
+        """
+        with self.transaction():
+            _, version = self.read_versioned(key)
+            if expected_version is not None and version != expected_version:
+                return None
+            return self._store(key, value, version + 1, pushed)
+
+    def update(self, key, change):
+        """Store change(current value) in one transaction; returns (value, version)."""
+        with self.transaction():
+            value, version = self.read_versioned(key)
+            value = change(None if value is MISSING else value)
+            return value, self._store(key, value, version + 1, pushed=False)
+
+    def seed(self, local):
+        """Copy keys the database does not have yet from a LocalFileBackend."""
+        pending = local.read_pending()
+        with self.transaction():
+            have = set(self.versions())
+            for key in self.files:
+                if key in have:
+                    continue
+                value = local.read(key)
+                if value is not MISSING:
+                    self._store(key, value, 1, pushed=key not in pending)
+
+    def read_pending(self):
+        return {key for (key,) in self.db.execute("SELECT key FROM state WHERE version > pushed")}
+
+    def pushed_version(self, key):
+        row = self.db.execute("SELECT pushed FROM state WHERE key = ?", (key,)).fetchone()
+        return 0 if row is None else row[0]
+
+    def request_sync(self, key, delay):
+        self.db.execute(
+            "INSERT INTO sync_requests (key, delay) VALUES (?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET delay = MIN(delay, excluded.delay)",
+            (key, delay),
+        )
+
+    def take_sync_requests(self):
+        """Return and clear the pending sync requests as {key: delay}."""
+        # Polled every refresh: a plain read first, so the usual empty poll
+        # never takes the write lock other processes need
+        if self.db.execute("SELECT 1 FROM sync_requests LIMIT 1").fetchone() is None:
+            return {}
+        with self.transaction():
+            requests = dict(self.db.execute("SELECT key, delay FROM sync_requests"))
+            self.db.execute("DELETE FROM sync_requests")
+        return requests
+
+    def read_bases(self):
+        return {key: (json.loads(value), sha) for key, value, sha in self.db.execute("SELECT key, value, sha FROM bases")}
+
+    def write_bases(self, bases):
+        with self.transaction():
+            self.db.executemany(
+                "INSERT OR REPLACE INTO bases (key, value, sha) VALUES (?, ?, ?)",
+                [(key, json.dumps(value), sha) for key, (value, sha) in bases.items()],
+            )
+
+    def mark_pushed(self, key, version):
+        self.db.execute("UPDATE state SET pushed = MAX(pushed, ?) WHERE key = ?", (version, key))
+
+    def close(self):
+        self.db.close()
+
+
+class GitHubContentsBackend:
+    """Replicates keys to files through the GitHub Contents API.
+
+    ``files`` maps key -> (read_url, upload_url, codec). Reads go through
+    the shared ContentsCache so unchanged files come back as 304s.
+    """
+
+    def __init__(self, http_pool, cache, headers, files):
+        self.http_pool = http_pool
+        self.cache = cache
+        self.headers = headers
+        self.files = files
+
+    async def _fetch(self, key, max_age):
+        read_url, _, codec = self.files[key]
+        try:
+            return await self.cache.fetch(
+                self.http_pool.session("github"), read_url, self.headers,
+                parse=lambda text: decode_value(codec, text), max_age=max_age, missing_ok=True,
+            )
+        except ValueError as e:
+            raise RemoteError(f"Could not parse remote {key}: {e}") from e
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            raise RemoteError(f"Could not reach GitHub for {key}: {e!r}") from e
+
+    async def read_entry(self, key, max_age=0):
+        """Return (value, blob SHA); (MISSING, None) if the file does not exist."""
+        entry = await self._fetch(key, max_age)
+        if entry is None:
+            raise RemoteError(f"Could not read remote {key}")
+        if entry.sha is None:
+            return MISSING, None
+        return entry.value, entry.sha
+
+    async def read(self, key, max_age=0):
+        return (await self.read_entry(key, max_age))[0]
+
+    async def write(self, key, value, sha=None):
+        """Replace the blob ``sha`` (None creates the file); returns the new SHA.
+
+        Raises WriteConflict if the file is no longer at ``sha``, and returns
+        None on any other failure.
+        """
+        read_url, upload_url, codec = self.files[key]
+        payload = {
+            "message": f"Update {key}",
+            "content": base64.b64encode(encode_value(codec, value).encode()).decode(),
+        }
+        if sha:
+            payload["sha"] = sha
+
+        session = self.http_pool.session("github")
+        try:
+            async with session.put(upload_url, headers=self.headers, json=payload) as resp:
+                if resp.status in (200, 201):
+                    self.cache.invalidate(read_url)
+                    return (await resp.json())["content"]["sha"]
+                if resp.status in (409, 422):
+                    # 409: stale sha; 422: no sha for a file that exists (or one for a file that doesn't)
+                    self.cache.invalidate(read_url)
+                    raise WriteConflict(f"{key}: {resp.status} - {await resp.text()}")
+                logger.error(f"⚠️ Failed to push {key} to GitHub: {resp.status} - {await resp.text()}")
+                return None
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.error(f"⚠️ Failed to push {key} to GitHub: {e!r}")
+            return None
+
+
+class StateStore:
+    """Local-first key/value state with optional asynchronous replication.
+
+    ``get`` never leaves the process. ``set`` updates memory at once, writes
+    the local file from a worker thread and marks the key for replication; ``sync_policy`` maps key ->
+    (interval seconds, max pending writes) for its WriteBehind. Numbers in
+    the ``counters`` keys add up when a push merges concurrent edits, and
+    ``on_merge(key)`` is called when a merge changes the local value.
+    Values returned by ``get`` are shared; copy them before editing.
+    """
+
+    def __init__(self, local, remote=None, sync_policy=None, counters=()):
+        self.local = local
+        self.remote = remote
+        self.counters = set(counters)
+        self.on_merge = None
+        self._values = {}
+        self._pending = set()
+        self._bases = {}   # key -> (value, blob SHA) last synced with the remote
+        self._writers = {}
+        self._unsaved = set()          # keys whose local file is behind memory
+        self._pending_unsaved = False
+        self._bases_unsaved = False
+        self._local_task = None
+        self._replicated = set(remote.files) & set(local.files) if remote is not None else set()
+        sync_policy = sync_policy or {}
+        for key in self._replicated:
+            interval, max_pending = sync_policy.get(key, (60, 1))
+            self._writers[key] = WriteBehind(
+                lambda key=key: self._push(key), interval=interval, max_pending=max_pending, name=key
+            )
+
+    def load(self):
+        """Read every key from the local backend. Cheap; safe to call at import time."""
+        for key in self.local.files:
+            value = self.local.read(key)
+            if value is not MISSING:
+                self._values[key] = value
+        self._bases = self.local.read_bases()
+        self._pending = self.local.read_pending() & self._replicated
+        for key in self._pending:
+            self._writers[key].pending = 1
+
+    def has(self, key):
+        return key in self._values
+
+    def get(self, key, default=None):
+        return self._values.get(key, default)
+
+    def set(self, key, value):
+        value = copy.deepcopy(value)
+        self._set(key, value)
+
+    def update(self, key, change):
+        """Set key to change(current value) and return the new value.
+
+        ``change`` gets a copy of the current value (None if unset). With a
+        shared backend the read and the write are one transaction, so
+        concurrent updates from other processes are not lost.
+        """
+        value = change(copy.deepcopy(self._values.get(key)))
+        self._set(key, value)
+        return value
+
+    def _set(self, key, value):
+        self._values[key] = value
+        if key not in self._replicated:
+            self._save_local(key)
+            return
+        new = key not in self._pending
+        self._pending.add(key)
+        self._save_local(key, pending=new)
+        self._writers[key].mark_dirty()
+
+    # --- Local writes ---
+    # Writing a file means a temp file, an fsync and a rename, too slow for
+    # the event loop on every bonk. One task does the writes in a worker
+    # thread; whatever changes while a write is in flight goes out in the
+    # next round, latest values only. Without a running loop (scripts,
+    # import time) the write happens right away.
+    def _save_local(self, key=None, pending=False, bases=False):
+        if key is not None:
+            self._unsaved.add(key)
+        self._pending_unsaved |= pending
+        self._bases_unsaved |= bases
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._write_unsaved(*self._take_unsaved())
+            return
+        if self._local_task is None or self._local_task.done():
+            self._local_task = loop.create_task(self._flush_local())
+
+    def _take_unsaved(self):
+        values = {key: self._values[key] for key in self._unsaved if key in self._values}
+        pending = set(self._pending) if self._pending_unsaved else None
+        bases = dict(self._bases) if self._bases_unsaved else None
+        self._unsaved, self._pending_unsaved, self._bases_unsaved = set(), False, False
+        return values, pending, bases
+
+    def _write_unsaved(self, values, pending, bases):
+        for key, value in values.items():
+            self.local.write(key, value)
+        if pending is not None:
+            self.local.write_pending(pending)
+        if bases is not None:
+            self.local.write_bases(bases)
+
+    async def _flush_local(self):
+        while self._unsaved or self._pending_unsaved or self._bases_unsaved:
+            try:
+                await asyncio.to_thread(self._write_unsaved, *self._take_unsaved())
+            except Exception as e:
+                logger.error(f"❌ Could not write local state: {e}")
+                return
+
+    async def flush_local(self):
+        """Wait until the local files have caught up with memory."""
+        while self._local_task is not None and not self._local_task.done():
+            await self._local_task
+
+    def is_pending(self, key):
+        return key in self._pending
+
+    def _set_base(self, key, value, sha):
+        if sha is not None and self._bases.get(key, (None, None))[1] != sha:
+            self._bases[key] = (copy.deepcopy(value), sha)
+            self._save_local(bases=True)
+
+    def _merge(self, key, base, ours, theirs):
+        merged, conflicts = merge3(base, ours, theirs, counters=key in self.counters)
+        if conflicts:
+            logger.warning(f"⚠️ {key} was edited on both sides, kept ours for: {', '.join(conflicts)}")
+        return merged
+
+    def _merged(self, key):
+        if self.on_merge is not None:
+            self.on_merge(key)
+
+    async def pull(self, key):
+        """Refresh key from the remote. Keys with unpushed local writes are kept.
+
+        Returns True if the local value changed.
+        """
+        if key not in self._replicated or key in self._pending:
+            return False
+        try:
+            value, sha = await self.remote.read_entry(key)
+        except RemoteError as e:
+            logger.error(f"❌ Could not pull {key}: {e}")
+            return False
+        # A local set may have happened while the read was in flight
+        if key in self._pending:
+            return False
+        self._set_base(key, value, sha)
+        if value is MISSING or value == self._values.get(key, MISSING):
+            return False
+        self._values[key] = value
+        self._save_local(key)
+        return True
+
+    async def _commit(self, key, value):
+        """Push value, merged with whatever the remote gained since our base.
+
+        Returns what the remote holds afterwards (value or the merge), or
+        MISSING if the push failed.
+        """
+        for attempt in range(PUSH_ATTEMPTS):
+            # A 304 revalidation when nothing changed. Never push blind over
+            # a remote copy we could not read.
+            try:
+                theirs, sha = await self.remote.read_entry(key)
+            except RemoteError as e:
+                logger.error(f"❌ Not pushing {key}: remote copy is unreadable ({e})")
+                return MISSING
+            merged = value
+            base = self._bases.get(key)
+            if sha is not None and base is not None and sha != base[1]:
+                merged = self._merge(key, base[0], value, theirs)
+            if sha is not None and merged == theirs:
+                self._set_base(key, theirs, sha)  # nothing to commit
+                return merged
+            try:
+                new_sha = await self.remote.write(key, merged, sha)
+            except WriteConflict:
+                logger.info(f"🔁 {key} changed during the push, merging again ({attempt + 1}/{PUSH_ATTEMPTS})")
+                continue
+            if new_sha is None:
+                return MISSING
+            self._set_base(key, merged, new_sha)
+            return merged
+        logger.error(f"❌ Gave up pushing {key} after {PUSH_ATTEMPTS} conflicting writes")
+        return MISSING
+
+    async def _push(self, key):
+        if key not in self._pending:
+            return True
+        if key not in self._values:
+            self._pending.discard(key)
+            self._save_local(pending=True)
+            return True
+        written = self._values[key]
+        pushed = await self._commit(key, written)
+        if pushed is MISSING:
+            return False
+        current = self._values[key]
+        if pushed != written:
+            # Bring the remote's edits home, on top of anything set during the push
+            value = pushed if current is written else self._merge(key, written, current, pushed)
+            self._values[key] = value
+            self._save_local(key)
+            self._merged(key)
+        # Only clear the flag if nothing newer was set during the push
+        if current is written:
+            self._pending.discard(key)
+            self._save_local(pending=True)
+        return True
+
+    async def start(self):
+        """Start replication and push writes left over from a previous run."""
+        if self.remote is None:
+            return
+        for key, writer in self._writers.items():
+            writer.start()
+            if key in self._pending:
+                await writer.flush()
+
+    async def sync(self, key, delay=0):
+        """Push key now instead of waiting for its interval; True once it is on the remote.
+
+        With ``delay``, callers syncing the same key within that many
+        seconds share one commit.
+        """
+        if key not in self._replicated:
+            return True
+        return await self._writers[key].flush_soon(delay)
+
+    async def close(self):
+        for writer in self._writers.values():
+            await writer.close()
+        await self.flush_local()
+
+
+class SharedStateStore(StateStore):
+    """StateStore over a SqliteBackend that several processes share.
+
+    Writes go straight to the database; ``refresh`` reloads the keys other
+    processes changed since the last call. Only the ``replicator`` process
+    pushes to and pulls from the remote; the others get its pulls through
+    ``refresh``.
+    """
+
+    def __init__(self, local, remote=None, sync_policy=None, counters=(), replicator=True):
+        super().__init__(local, remote, sync_policy, counters)
+        self.replicator = replicator
+        self._versions = {}
+        self._sync_tasks = set()  # flushes other processes asked for
+
+    def _reload(self):
+        changed = []
+        for key, version in self.local.versions().items():
+            if key not in self.local.files or version == self._versions.get(key):
+                continue
+            self._values[key], self._versions[key] = self.local.read_versioned(key)
+            changed.append(key)
+        return changed
+
+    def load(self):
+        self._reload()
+        self._bases = self.local.read_bases()
+        if self.replicator:
+            self._pending = self.local.read_pending() & self._replicated
+            for key in self._pending:
+                self._writers[key].pending = 1
+
+    def refresh(self):
+        """Reload keys other processes wrote; returns the keys that changed."""
+        changed = self._reload()
+        if self.replicator:
+            # Their writes are ours to push
+            self._pending = self.local.read_pending() & self._replicated
+            for key in self._pending:
+                if not self._writers[key].dirty:
+                    self._writers[key].mark_dirty()
+            for key, delay in self.local.take_sync_requests().items():
+                if key in self._replicated:
+                    task = asyncio.ensure_future(self._writers[key].flush_soon(delay))
+                    self._sync_tasks.add(task)
+                    task.add_done_callback(self._sync_tasks.discard)
+        return changed
+
+    def _stored(self, key, value, version):
+        self._values[key] = value
+        self._versions[key] = version
+        if key in self._replicated and self.replicator:
+            self._pending.add(key)
+            self._writers[key].mark_dirty()
+
+    def _set(self, key, value):
+        self._stored(key, value, self.local.write(key, value))
+
+    def _save_local(self, key=None, pending=False, bases=False):
+        # Values and pending flags are written with the database row; the
+        # connection belongs to the loop's thread, so bases are written here
+        if bases:
+            self.local.write_bases(self._bases)
+
+    def update(self, key, change):
+        value, version = self.local.update(key, change)
+        self._stored(key, value, version)
+        return value
+
+    def is_pending(self, key):
+        return key in self.local.read_pending()
+
+    async def pull(self, key):
+        if not self.replicator or key not in self._replicated:
+            return False  # refresh() brings in what the replicator pulled
+        if key in self.local.read_pending():
+            return False
+        version = self._versions.get(key, 0)
+        try:
+            value, sha = await self.remote.read_entry(key)
+        except RemoteError as e:
+            logger.error(f"❌ Could not pull {key}: {e}")
+            return False
+        if value is MISSING or value == self._values.get(key, MISSING):
+            if key not in self.local.read_pending():
+                self._set_base(key, value, sha)
+            return False
+        # Another process may have written the key while the read was in flight
+        version = self.local.write(key, value, pushed=True, expected_version=version)
+        if version is None:
+            return False
+        self._set_base(key, value, sha)
+        self._values[key] = value
+        self._versions[key] = version
+        return True
+
+    async def _push(self, key):
+        if key not in self.local.read_pending():
+            self._pending.discard(key)
+            return True
+        # The latest value from any process, not just this one's
+        value, version = self.local.read_versioned(key)
+        pushed = await self._commit(key, value)
+        if pushed is MISSING:
+            return False
+        # A merged value lands in the database; refresh() hands it to every process
+        if pushed == value:
+            self.local.mark_pushed(key, version)
+        elif self.local.write(key, pushed, pushed=True, expected_version=version) is None:
+            # Written to during the push: merge the remote's edits into that
+            self.local.mark_pushed(key, version)
+            self.local.update(key, lambda current: self._merge(key, value, current, pushed))
+        if key not in self.local.read_pending():
+            self._pending.discard(key)
+        return True
+
+    async def start(self):
+        if self.replicator:
+            await super().start()
+
+    async def sync(self, key, delay=0, timeout=SYNC_TIMEOUT):
+        if self.replicator:
+            return await super().sync(key, delay)
+        if key not in self._replicated:
+            return True
+        # The replicator does the push: ask it to, then wait for our version
+        # to reach the remote. False if that takes longer than timeout.
+        version = self._versions.get(key, 0)
+        self.local.request_sync(key, delay)
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + delay + timeout
+        while self.local.pushed_version(key) < version:
+            if loop.time() >= deadline:
+                return False
+            await asyncio.sleep(SYNC_POLL_SECONDS)
+        return True
+
+    async def close(self):
+        await super().close()
+        self.local.close()
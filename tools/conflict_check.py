@@ -0,0 +1,154 @@
+"""Drive concurrent state writers against the fake GitHub and check nothing is lost.
+
+Usage: python tools/conflict_check.py [edits_per_writer]
+
+Starts tools/fake_github.py in-process and points two StateStores at it
+(two bot instances with their own local state), plus an "editor" that
+commits to cosmetic_roles.json directly, like someone editing the file on
+GitHub. Then:
+
+- both bots add cosmetic roles in bursts, each awaiting sync() like
+  !addrole does, while the editor keeps committing its own keys;
+- both bots count bonks and push them.
+
+Every role key from every writer must end up in the final file, the bonk
+count must be the sum of both bots' bonks, and each burst of edits must
+collapse into about one commit. The bots use the bot's SYNC_POLICY for
+cosmetic_roles, so this also checks that policy leaves commits to sync().
+"""
+import asyncio
+import base64
+import json
+import os
+import sys
+import tempfile
+
+import aiohttp
+from aiohttp import web
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "tools"))
+
+from fake_github import FakeContentsAPI  # noqa: E402
+from github_cache import ContentsCache  # noqa: E402
+from http_pool import HttpPool  # noqa: E402
+from lanschild.state import SYNC_POLICY  # noqa: E402
+from state_store import GitHubContentsBackend, LocalFileBackend, StateStore  # noqa: E402
+
+PORT = 8791
+BASE_URL = f"http://127.0.0.1:{PORT}/repos/me/bot/contents"
+FILES = {
+    "cosmetic_roles": ("cosmetic_roles.json", "json"),
+    "bonk_counter": ("bonk_counter.json", "json"),
+}
+COMMIT_DELAY = 0.2
+
+
+def make_store(http_pool):
+    remote = GitHubContentsBackend(http_pool, ContentsCache(max_age=30), {}, {
+        key: (f"{BASE_URL}/{name}", f"{BASE_URL}/{name}", codec) for key, (name, codec) in FILES.items()
+    })
+    store = StateStore(
+        LocalFileBackend(tempfile.mkdtemp(prefix="bot-state-"), FILES), remote,
+        sync_policy={**SYNC_POLICY, "bonk_counter": (0.5, 1000)}, counters=("bonk_counter",),
+    )
+    store.load()
+    return store
+
+
+async def editor(session, edits):
+    """Commit keys straight to GitHub, retrying on 409 like any other client.
+
+    Returns the number of PUTs it made, 409s included.
+    """
+    url = f"{BASE_URL}/cosmetic_roles.json"
+    puts = 0
+    for i in range(edits):
+        while True:
+            async with session.get(url) as resp:
+                data = await resp.json()
+            roles = json.loads(base64.b64decode(data["content"]))
+            roles[f"editor-{i}"] = f"Editor {i}"
+            payload = {"message": "edit", "sha": data["sha"],
+                       "content": base64.b64encode(json.dumps(roles).encode()).decode()}
+            puts += 1
+            async with session.put(url, json=payload) as resp:
+                if resp.status == 200:
+                    break
+        await asyncio.sleep(0.05)
+    return puts
+
+
+async def add_roles(store, name, edits):
+    async def add(i):
+        store.update("cosmetic_roles", lambda roles: {**(roles or {}), f"{name}-{i}": f"{name} {i}"})
+        return await store.sync("cosmetic_roles", delay=COMMIT_DELAY)
+
+    results = []
+    for burst in range(0, edits, 5):
+        results += await asyncio.gather(*(add(i) for i in range(burst, min(burst + 5, edits))))
+    return results
+
+
+async def main():
+    edits = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    root = tempfile.mkdtemp(prefix="fake-github-")
+    with open(os.path.join(root, "cosmetic_roles.json"), "w", encoding="utf-8") as f:
+        json.dump({"seed": "Seed"}, f)
+    with open(os.path.join(root, "bonk_counter.json"), "w", encoding="utf-8") as f:
+        json.dump({"count": 10}, f)
+    api = FakeContentsAPI(root)
+    runner = web.AppRunner(api.app(), access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", PORT).start()
+
+    pools = [HttpPool(), HttpPool()]
+    try:
+        for pool in pools:
+            await pool.start()
+        bots = [make_store(pool) for pool in pools]
+        for store in bots:
+            await store.pull("cosmetic_roles")
+            await store.pull("bonk_counter")
+            await store.start()
+
+        async with aiohttp.ClientSession() as session:
+            results = await asyncio.gather(
+                add_roles(bots[0], "a", edits), add_roles(bots[1], "b", edits), editor(session, edits),
+            )
+        for store, bonks in zip(bots, (7, 5)):
+            for _ in range(bonks):
+                store.update("bonk_counter", lambda counter: {"count": (counter or {}).get("count", 0) + 1})
+        for store in bots:
+            await store.close()
+            await store.pull("cosmetic_roles")  # the editor may have committed after our last push
+    finally:
+        for pool in pools:
+            await pool.close()
+        await runner.cleanup()
+
+    with open(os.path.join(root, "cosmetic_roles.json"), encoding="utf-8") as f:
+        roles = json.load(f)
+    with open(os.path.join(root, "bonk_counter.json"), encoding="utf-8") as f:
+        bonks = json.load(f)["count"]
+    expected = {"seed"} | {f"{who}-{i}" for who in ("a", "b", "editor") for i in range(edits)}
+    puts = [path for method, path in api.requests if method == "PUT" and path.endswith("cosmetic_roles.json")]
+    bot_puts = len(puts) - results[2]
+    # One commit per burst of 5 per bot, plus the odd retry after a 409
+    bursts = 2 * -(-edits // 5)
+    confirmed = sum(ok for result in results[:2] for ok in result)
+
+    print(f"cosmetic roles: {len(roles)} keys, {len(expected - set(roles))} lost")
+    print(f"role edits confirmed: {confirmed}/{2 * edits}, PUTs to cosmetic_roles.json: {len(puts)} "
+          f"({results[2]} by the editor, {bot_puts} by the bots for {bursts} bursts, 409s included)")
+    print(f"bonk count: {bonks} (expected {10 + 7 + 5})")
+    print(f"local copies match GitHub: {[store.get('cosmetic_roles') == roles for store in bots]}")
+    assert not expected - set(roles), "edits were lost"
+    assert bonks == 22, "bonks were lost"
+    assert confirmed == 2 * edits, "some edits were not confirmed"
+    assert bot_puts <= bursts + bursts // 4 + 1, "role edits were not batched into one commit per burst"
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,149 @@
+"""Local stand-in for the GitHub Contents API, for testing state sync offline.
+
+Usage: python tools/fake_github.py [--port 8787] [--root DIR]
+
+Serves GET/PUT /repos/<owner>/<repo>/contents/<path> from files under
+--root (default: a temporary copy of nothing, i.e. an empty repo). Point the
+*_URL / *_UPLOAD_URL variables in .env at it, e.g.
+
+    COSMETIC_ROLES_URL=http://127.0.0.1:8787/repos/me/bot/contents/cosmetic_roles.json
+
+Like GitHub it returns base64 content with a blob SHA and an ETag, answers
+If-None-Match with 304, creates files on PUT without a sha, and rejects a
+PUT whose sha is stale with 409.
+
+It can also misbehave, to exercise the request scheduler: --limit N
+--window S hands out N requests per S-second window with X-RateLimit-*
+headers and answers 403 once they run out; --throttle-every N answers every
+Nth request with 429 and Retry-After; --fail-every N answers every Nth
+request with 503.
+"""
+import argparse
+import base64
+import hashlib
+import math
+import os
+import tempfile
+import time
+
+from aiohttp import web
+
+
+def blob_sha(data):
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+
+
+class FakeContentsAPI:
+    def __init__(self, root, limit=None, window=60, throttle_every=None, retry_after=1, fail_every=None):
+        self.root = root
+        self.requests = []
+        self.refused = []   # (method, path, status) answered by the misbehaviour options
+        self.limit = limit
+        self.window = window
+        self.throttle_every = throttle_every
+        self.retry_after = retry_after
+        self.fail_every = fail_every
+        self._window_start = time.time()
+        self._used = 0
+        self._seen = 0
+
+    @web.middleware
+    async def misbehave(self, request, handler):
+        self._seen += 1
+        headers = {}
+        if self.limit is not None:
+            now = time.time()
+            if now - self._window_start >= self.window:
+                self._window_start, self._used = now, 0
+            reset = math.ceil(self._window_start + self.window)
+            if self._used >= self.limit:
+                self.refused.append((request.method, request.path, 403))
+                return web.json_response(
+                    {"message": "API rate limit exceeded"}, status=403,
+                    headers={"X-RateLimit-Limit": str(self.limit), "X-RateLimit-Remaining": "0", "X-RateLimit-Reset": str(reset)},
+                )
+            self._used += 1
+            headers = {"X-RateLimit-Limit": str(self.limit), "X-RateLimit-Remaining": str(self.limit - self._used), "X-RateLimit-Reset": str(reset)}
+        if self.throttle_every and self._seen % self.throttle_every == 0:
+            self.refused.append((request.method, request.path, 429))
+            return web.json_response({"message": "slow down"}, status=429, headers={"Retry-After": str(self.retry_after)})
+        if self.fail_every and self._seen % self.fail_every == 0:
+            self.refused.append((request.method, request.path, 503))
+            return web.json_response({"message": "Service Unavailable"}, status=503)
+        response = await handler(request)
+        response.headers.update(headers)
+        return response
+
+    def _path(self, request):
+        path = os.path.normpath(request.match_info["path"])
+        if path.startswith(".."):
+            raise web.HTTPBadRequest()
+        return os.path.join(self.root, path)
+
+    async def get(self, request):
+        self.requests.append(("GET", request.path))
+        path = self._path(request)
+        if not os.path.isfile(path):
+            return web.json_response({"message": "Not Found"}, status=404)
+        with open(path, "rb") as f:
+            data = f.read()
+        sha = blob_sha(data)
+        etag = f'"{sha}"'
+        if request.headers.get("If-None-Match") == etag:
+            return web.Response(status=304, headers={"ETag": etag})
+        body = {
+            "name": os.path.basename(path),
+            "path": request.match_info["path"],
+            "sha": sha,
+            "size": len(data),
+            "encoding": "base64",
+            "content": base64.encodebytes(data).decode(),
+        }
+        return web.json_response(body, headers={"ETag": etag})
+
+    async def put(self, request):
+        self.requests.append(("PUT", request.path))
+        path = self._path(request)
+        payload = await request.json()
+        current = None
+        if os.path.isfile(path):
+            with open(path, "rb") as f:
+                current = blob_sha(f.read())
+        if current is not None and payload.get("sha") != current:
+            return web.json_response({"message": f"{request.match_info['path']} does not match {payload.get('sha')}"}, status=409)
+        if current is None and payload.get("sha"):
+            return web.json_response({"message": "sha provided for a file that does not exist"}, status=422)
+
+        data = base64.b64decode(payload["content"])
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(data)
+        status = 200 if current is not None else 201
+        return web.json_response({"content": {"sha": blob_sha(data)}, "commit": {"message": payload.get("message")}}, status=status)
+
+    def app(self):
+        app = web.Application(middlewares=[self.misbehave])
+        route = "/repos/{owner}/{repo}/contents/{path:.+}"
+        app.router.add_get(route, self.get)
+        app.router.add_put(route, self.put)
+        return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8787)
+    parser.add_argument("--root", default=None, help="directory holding the repository files")
+    parser.add_argument("--limit", type=int, default=None, help="requests allowed per window (default: unlimited)")
+    parser.add_argument("--window", type=float, default=60, help="rate limit window in seconds")
+    parser.add_argument("--throttle-every", type=int, default=None, help="answer every Nth request with 429")
+    parser.add_argument("--retry-after", type=int, default=1, help="Retry-After seconds sent with a 429")
+    parser.add_argument("--fail-every", type=int, default=None, help="answer every Nth request with 503")
+    args = parser.parse_args()
+    root = args.root or tempfile.mkdtemp(prefix="fake-github-")
+    print(f"Serving fake GitHub Contents API for {root} on http://127.0.0.1:{args.port}")
+    api = FakeContentsAPI(root, args.limit, args.window, args.throttle_every, args.retry_after, args.fail_every)
+    web.run_app(api.app(), host="127.0.0.1", port=args.port)
+
+
+if __name__ == "__main__":
+    main()
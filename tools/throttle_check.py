@@ -0,0 +1,84 @@
+"""Drive the request scheduler against a misbehaving fake GitHub.
+
+Usage: python tools/throttle_check.py [background_requests] [interactive_requests]
+
+Starts tools/fake_github.py in-process with a small rate limit window, a 429
+every 11th request and a 503 every 7th, then fires a burst of background
+GETs and, partway through, a few interactive ones. Prints how long each
+priority waited, what the server refused and the scheduler's counters.
+Every request is expected to end in a 200.
+"""
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+import aiohttp
+from aiohttp import web
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "tools"))
+
+from fake_github import FakeContentsAPI  # noqa: E402
+from request_scheduler import BACKGROUND, INTERACTIVE, RequestScheduler, ScheduledSession, request_priority  # noqa: E402
+
+PORT = 8790
+
+
+async def timed_get(session, url, priority):
+    request_priority.set(priority)
+    start = time.perf_counter()
+    async with session.get(url) as resp:
+        await resp.read()
+        return resp.status, time.perf_counter() - start
+
+
+async def main():
+    background = int(sys.argv[1]) if len(sys.argv) > 1 else 40
+    interactive = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    root = tempfile.mkdtemp(prefix="fake-github-")
+    with open(os.path.join(root, "prompts.txt"), "w", encoding="utf-8") as f:
+        f.write("A prompt\n")
+    api = FakeContentsAPI(root, limit=25, window=3, throttle_every=11, retry_after=1, fail_every=7)
+    runner = web.AppRunner(api.app(), access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", PORT).start()
+
+    scheduler = RequestScheduler(
+        limits={"github": {"rate": 20.0, "burst": 5}}, base_delay=0.05, max_delay=1.0,
+        max_wait={INTERACTIVE: 10.0, BACKGROUND: 60.0},
+    )
+    url = f"http://127.0.0.1:{PORT}/repos/me/bot/contents/prompts.txt"
+    try:
+        async with aiohttp.ClientSession() as raw:
+            session = ScheduledSession(raw, "github", scheduler)
+            start = time.perf_counter()
+            jobs = [asyncio.create_task(timed_get(session, url, BACKGROUND)) for _ in range(background)]
+            await asyncio.sleep(0.2)
+            jobs += [asyncio.create_task(timed_get(session, url, INTERACTIVE)) for _ in range(interactive)]
+            results = await asyncio.gather(*jobs)
+            total = time.perf_counter() - start
+    finally:
+        await runner.cleanup()
+
+    statuses = {status for status, _ in results}
+    bg = [seconds for _, seconds in results[:background]]
+    fg = [seconds for _, seconds in results[background:]]
+    print(f"{len(results)} requests in {total:.2f}s, final statuses: {sorted(statuses)}")
+    print(f"background  median {statistics.median(bg):.2f}s  max {max(bg):.2f}s")
+    if fg:
+        print(f"interactive median {statistics.median(fg):.2f}s  max {max(fg):.2f}s (sent 0.2s later)")
+    refused = {}
+    for _, _, status in api.refused:
+        refused[status] = refused.get(status, 0) + 1
+    print(f"server refused: {refused}")
+    print(f"scheduler: {scheduler.stats['github']}")
+    assert statuses == {200}, "some requests did not succeed"
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
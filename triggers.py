@@ -0,0 +1,265 @@
+import json
+import logging
+import os
+import re
+
+logger = logging.getLogger(__name__)
+
+# --- Trigger Engine ---
+# All phrase and regex triggers are compiled once at startup. Literal phrases
+# are folded into a trie (the goto function of an Aho-Corasick automaton) and
+# emitted as one factored regex, so the scan rejects most positions on the
+# first character. Regex patterns without groups, backreferences or inline
+# flags are joined into one alternation; the rest would change meaning (or
+# fail to compile) there, so they are searched one by one. Each message is
+# lowered once and each scanner makes a single pass; only the positions
+# where a scanner hits are resolved back to trigger groups.
+
+PHRASE = "phrase"
+REGEX = "regex"
+
+
+def _build_trie(phrases):
+    root = {}
+    for phrase, group in phrases:
+        node = root
+        for ch in phrase:
+            node = node.setdefault(ch, {})
+        node.setdefault(None, set()).add(group)
+    return root
+
+
+def _trie_pattern(node):
+    alternatives = [
+        re.escape(ch) + _trie_pattern(node[ch])
+        for ch in sorted(ch for ch in node if ch is not None)
+    ]
+    if not alternatives:
+        return ""
+    body = alternatives[0] if len(alternatives) == 1 else "(?:" + "|".join(alternatives) + ")"
+    if None in node:
+        body = f"(?:{body})?"
+    return body
+
+
+def _combinable(pattern):
+    """True if pattern means the same inside a shared alternation.
+
+    Capturing and named groups, backreferences and inline flags are
+    renumbered, clash or are rejected there. Lookarounds and (?:...) are fine.
+    """
+    i, n = 0, len(pattern)
+    in_class = False
+    while i < n:
+        ch = pattern[i]
+        if ch == "\\":
+            if not in_class and pattern[i + 1:i + 2].isdigit():
+                return False
+            i += 2
+            continue
+        if in_class:
+            if ch == "]":
+                in_class = False
+        elif ch == "[":
+            in_class = True
+            # A "]" right after "[" or "[^" is a literal
+            if pattern.startswith("^", i + 1):
+                i += 1
+            if pattern.startswith("]", i + 1):
+                i += 1
+        elif ch == "(" and not pattern.startswith(("(?:", "(?=", "(?!", "(?<=", "(?<!"), i):
+            return False
+        i += 1
+    return True
+
+
+class TriggerEngine:
+    """Matches every trigger group against a message in one pass.
+
+    ``groups`` is an iterable of ``(name, match_type, patterns)`` where
+    ``match_type`` is ``"phrase"`` (case-insensitive substring) or
+    ``"regex"`` (each pattern searched on its own against the lowered
+    message). Passing the ``previous`` engine reuses its compiled patterns
+    where they are unchanged.
+    """
+
+    def __init__(self, groups, previous=None):
+        self.names = []
+        self._order = {}
+        phrases = []
+        self._regexes = []    # (name, patterns) resolved at the combined scanner's hits
+        self._searched = []   # (name, patterns) that can't join the scanner
+        self._compiled = {}
+        reusable = previous._compiled if previous is not None else {}
+
+        for name, match_type, patterns in groups:
+            if name in self._order:
+                raise ValueError(f"Duplicate trigger group: {name}")
+            if match_type not in (PHRASE, REGEX):
+                raise ValueError(f"Unknown match type for {name}: {match_type}")
+            self._order[name] = len(self.names)
+            self.names.append(name)
+            if not patterns:
+                continue
+            if match_type == PHRASE:
+                phrases.extend((p.lower(), name) for p in patterns if p)
+            else:
+                combined, searched = [], []
+                for source in patterns:
+                    pattern = reusable.get(source) or re.compile(source)
+                    self._compiled[source] = pattern
+                    (combined if _combinable(source) else searched).append(pattern)
+                if combined:
+                    self._regexes.append((name, combined))
+                if searched:
+                    self._searched.append((name, searched))
+
+        self._trie = _build_trie(phrases)
+        self._phrase_scanner = re.compile(_trie_pattern(self._trie)) if phrases else None
+        self._regex_scanner = None
+        if self._regexes:
+            self._regex_scanner = re.compile(
+                "|".join(f"(?:{pattern.pattern})" for _, patterns in self._regexes for pattern in patterns)
+            )
+
+    def _scan_phrases(self, text, fired):
+        search = self._phrase_scanner.search
+        hit = search(text)
+        while hit is not None:
+            # Walk the trie from the hit; every terminal on the path fired.
+            pos = hit.start()
+            node = self._trie
+            for ch in text[pos:]:
+                node = node.get(ch)
+                if node is None:
+                    break
+                if None in node:
+                    fired.update(node[None])
+            hit = search(text, pos + 1)
+
+    def _scan_regexes(self, text, fired):
+        pending = {name for name, _ in self._regexes}
+        search = self._regex_scanner.search
+        hit = search(text)
+        while hit is not None:
+            # The alternation reports one group per position; check the rest there too.
+            pos = hit.start()
+            for name, patterns in self._regexes:
+                if name in pending and any(pattern.match(text, pos) for pattern in patterns):
+                    pending.discard(name)
+                    fired.add(name)
+            if not pending:
+                break
+            hit = search(text, pos + 1)
+
+    def _search_each(self, text, fired):
+        for name, patterns in self._searched:
+            if name not in fired and any(pattern.search(text) for pattern in patterns):
+                fired.add(name)
+
+    def match(self, content):
+        """Return the names of all trigger groups that fired, in declaration order."""
+        if not content:
+            return []
+        text = content.lower()
+        fired = set()
+        if self._phrase_scanner is not None:
+            self._scan_phrases(text, fired)
+        if self._regex_scanner is not None:
+            self._scan_regexes(text, fired)
+        if self._searched:
+            self._search_each(text, fired)
+        return sorted(fired, key=self._order.__getitem__)
+
+
+# --- Trigger Registry ---
+REQUIRED_FIELDS = ("name", "match", "patterns", "responses")
+
+
+def _check_trigger(entry, names):
+    missing = [field for field in REQUIRED_FIELDS if field not in entry]
+    if missing:
+        raise ValueError(f"missing {', '.join(missing)}")
+    if not entry["responses"]:
+        raise ValueError("no responses")
+    if entry["match"] not in (PHRASE, REGEX):
+        raise ValueError(f"unknown match type {entry['match']}")
+    if entry["name"] in names:
+        raise ValueError("duplicate name")
+    if entry["match"] == REGEX:
+        for pattern in entry["patterns"]:
+            re.compile(pattern)
+
+
+def load_triggers(path):
+    """Read the trigger file, returning the enabled triggers.
+
+    Each entry is validated (and its regexes compiled) on its own; a bad
+    entry is logged and skipped instead of failing the whole file.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if not isinstance(data, list):
+        raise ValueError("Trigger file must contain a list of triggers")
+
+    triggers = []
+    names = set()
+    for entry in data:
+        if not isinstance(entry, dict):
+            logger.error(f"❌ Skipping trigger entry that is not an object: {entry!r}")
+            continue
+        if not entry.get("enabled", True):
+            continue
+        try:
+            _check_trigger(entry, names)
+        except (ValueError, re.error) as e:
+            logger.error(f"❌ Skipping trigger {entry.get('name', '?')}: {e}")
+            continue
+        names.add(entry["name"])
+        triggers.append(entry)
+    return triggers
+
+
+class TriggerRegistry:
+    """Holds the compiled triggers from a JSON file and hot-reloads them.
+
+    ``snapshot`` is an ``(engine, triggers_by_name)`` pair that is replaced
+    in one assignment, so a message handler that reads it once always sees a
+    consistent engine and response table, even while a reload happens.
+    A file that fails to parse leaves the current snapshot live; a trigger
+    that fails to validate or compile is skipped on its own.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.snapshot = (TriggerEngine(()), {})
+        self._mtime = None
+        self._triggers = None
+
+    def reload(self, force=False):
+        """Recompile if the file changed. Returns True when a new snapshot went live."""
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except OSError as e:
+            logger.error(f"❌ Cannot stat trigger file {self.path}: {e}")
+            return False
+        if not force and mtime == self._mtime:
+            return False
+        self._mtime = mtime
+
+        try:
+            triggers = load_triggers(self.path)
+            if triggers == self._triggers:
+                return False
+            engine = TriggerEngine(
+                ((t["name"], t["match"], t["patterns"]) for t in triggers),
+                previous=self.snapshot[0],
+            )
+        except (OSError, ValueError, re.error) as e:
+            logger.error(f"❌ Failed to reload triggers, keeping the previous set: {e}")
+            return False
+
+        self.snapshot = (engine, {t["name"]: t for t in triggers})
+        self._triggers = triggers
+        logger.info(f"✅ Loaded {len(triggers)} triggers from {self.path}")
+        return True
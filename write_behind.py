@@ -0,0 +1,88 @@
+import asyncio
+import contextvars
+import logging
+
+logger = logging.getLogger(__name__)
+
+# --- Write-Behind Buffer ---
+# Changes stay in memory and are persisted by one save call after either
+# `interval` seconds or `max_pending` changes, whichever comes first, plus a
+# final flush on shutdown. Flushes never overlap, and a failed save keeps
+# the changes pending for the next attempt. Callers that need to know their
+# change is saved await flush_soon(), which lets a burst of them share one save.
+# Timed and threshold flushes run in a fresh context, so a flush triggered
+# from inside a command doesn't inherit its context variables (such as the
+# outbound request priority).
+
+
+class WriteBehind:
+    """Batches in-memory changes into occasional calls to ``save``.
+
+    ``save`` is an async callable that persists the current in-memory state
+    and returns True on success.
+    """
+
+    def __init__(self, save, interval=60, max_pending=20, name="state"):
+        self.save = save
+        self.interval = interval
+        self.max_pending = max_pending
+        self.name = name
+        self.pending = 0
+        self._lock = asyncio.Lock()
+        self._task = None
+        self._flush_task = None
+        self._soon = None
+
+    @property
+    def dirty(self):
+        return self.pending > 0
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), context=contextvars.Context())
+
+    def mark_dirty(self, changes=1):
+        self.pending += changes
+        if self.pending >= self.max_pending and (self._flush_task is None or self._flush_task.done()):
+            self._flush_task = asyncio.create_task(self.flush(), context=contextvars.Context())
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.flush()
+
+    async def flush(self):
+        async with self._lock:
+            if not self.pending:
+                return True
+            # Changes made while the save is in flight stay pending.
+            flushing = self.pending
+            try:
+                ok = await self.save()
+            except Exception as e:
+                logger.error(f"❌ Write-behind flush of {self.name} crashed: {e}")
+                ok = False
+            if ok:
+                self.pending -= flushing
+                logger.info(f"✅ Flushed {flushing} pending {self.name} change(s)")
+            return ok
+
+    async def flush_soon(self, delay=0):
+        """Flush after ``delay`` seconds; True once the changes made so far are saved.
+
+        Everyone who calls during the delay waits on the same flush.
+        """
+        if self._soon is None or self._soon.done():
+            self._soon = asyncio.ensure_future(self._delayed_flush(delay))
+        return await asyncio.shield(self._soon)
+
+    async def _delayed_flush(self, delay):
+        await asyncio.sleep(delay)
+        self._soon = None  # later callers need a flush that starts after their change
+        return await self.flush()
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        await self.flush()